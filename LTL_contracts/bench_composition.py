@@ -0,0 +1,44 @@
+import time
+from src.patterns import *
+
+sys.path.append(os.path.join(os.getcwd(), os.path.pardir))
+
+from LTL_contracts.src import formula as ltl
+from missions import mission
+
+
+def left_fold_composition(contracts):
+    """Pairwise left-to-right composition, the way composition used to be computed"""
+    comp = contracts[0]
+    for other in contracts[1:]:
+        folded = Contract()
+        folded.add_name(comp.name + '_comp_' + other.name)
+        folded.add_variables(list(set(comp.variables) | set(other.variables)))
+        folded.add_assumption(ltl.Or(ltl.And(comp.get_assumptions(), other.get_assumptions()),
+                                     ltl.Not(ltl.And(comp.get_guarantees(), other.get_guarantees()))))
+        folded.add_guarantee(ltl.And(comp.get_guarantees(), other.get_guarantees()))
+        comp = folded
+    return comp
+
+
+# the text of the left-folded specification grows quadratically, above this size it does not fit in memory
+FOLD_TEXT_LIMIT = 500
+
+
+def measure(compose, contracts, text=True):
+    """Returns the build time, the formula depth and the size of the satisfiability specification"""
+    start = time.time()
+    composed = compose(contracts)
+    elapsed = time.time() - start
+    spec = satisfiability(composed)
+    return elapsed, ltl.depth(spec), len(ltl.to_smv(spec)) if text else -1
+
+
+if __name__ == "__main__":
+
+    print("%6s  %12s %8s %10s  %12s %8s %10s" % ("size", "fold [s]", "depth", "chars", "n-ary [s]", "depth", "chars"))
+    for size in (10, 50, 100, 500, 1000):
+        contracts = mission(size)
+        fold = measure(left_fold_composition, contracts, size <= FOLD_TEXT_LIMIT)
+        nary = measure(composition, contracts)
+        print("%6d  %12.4f %8d %10d  %12.4f %8d %10d" % ((size,) + fold + nary))
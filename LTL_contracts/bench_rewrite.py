@@ -0,0 +1,27 @@
+import time
+from src.patterns import *
+
+sys.path.append(os.path.join(os.getcwd(), os.path.pardir))
+
+from LTL_contracts.src import rewrite
+from missions import mission
+
+
+def specs(contracts):
+    """Returns the compatibility, consistency and satisfiability specifications of the contracts and their
+    composition, as verify would write them"""
+    formulas = []
+    for contract in contracts + [composition(contracts)]:
+        formulas += [compatibility(contract), consistency(contract), satisfiability(contract)]
+    return formulas
+
+
+if __name__ == "__main__":
+
+    print("%6s  %10s %10s  %10s %10s  %10s" % ("size", "nodes", "after", "chars", "after", "time [s]"))
+    for size in (10, 50, 100, 500):
+        formulas = specs(mission(size))
+        start = time.time()
+        simplified, reduction = rewrite.simplify_all(formulas)
+        elapsed = time.time() - start
+        print("%6d  %10d %10d  %10d %10d  %10.4f" % ((size,) + tuple(reduction) + (elapsed,)))
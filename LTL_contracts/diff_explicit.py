@@ -0,0 +1,67 @@
+import re
+import time
+from src.patterns import *
+
+sys.path.append(os.path.join(os.getcwd(), os.path.pardir))
+
+from LTL_contracts.src import core, explicit, formula as ltl
+from LTL_contracts.src.propositional import Unsupported
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests_smv')
+
+DECLARATION = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_$#.]*)\s*:\s*(.+?)\s*;\s*$')
+SPECIFICATION = re.compile(r'^\s*LTLSPEC\s+(.+?)\s*;?\s*$')
+
+
+def read_model(smvfile):
+    """Returns the variable declarations and the LTL specifications of a NuSMV file of the corpus"""
+    with open(smvfile) as ifile:
+        text = re.sub(r'/--.*?--/', '', ifile.read(), flags=re.DOTALL)
+    variables, specs = [], []
+    for line in text.splitlines():
+        line = line.split('--')[0]
+        if SPECIFICATION.match(line):
+            specs.append(ltl.lift(SPECIFICATION.match(line).group(1)))
+        elif DECLARATION.match(line):
+            variables.append(DECLARATION.match(line).groups())
+    return variables, specs
+
+
+def nusmv_verdicts(smvfile):
+    """Returns whether each LTL specification of smvfile holds according to NuSMV"""
+    return ['is true' in line for line in core._stream(smvfile, False) if line[:16] == '-- specification']
+
+
+if __name__ == "__main__":
+
+    disagreements = 0
+    print("%-32s %5s %9s %12s %12s" % ("model", "specs", "agree", "NuSMV [s]", "explicit [s]"))
+    for name in sorted(os.listdir(CORPUS)):
+        smvfile = os.path.join(CORPUS, name)
+        variables, specs = read_model(smvfile)
+
+        start = time.time()
+        expected = nusmv_verdicts(smvfile)
+        nusmv_time = time.time() - start
+
+        start = time.time()
+        verdicts = []
+        for spec in specs:
+            try:
+                verdicts.append(explicit.holds(variables, spec))
+            except Unsupported:
+                verdicts.append(None)
+        explicit_time = time.time() - start
+
+        agree = 0
+        for spec, verdict, reference in zip(specs, verdicts, expected):
+            if verdict is None or verdict == reference:
+                agree += 1
+            else:
+                disagreements += 1
+                print("  DISAGREE on " + str(spec) + ": NuSMV " + str(reference) + ", explicit " + str(verdict))
+        print("%-32s %5d %9s %12.4f %12.4f" % (name, len(specs), str(agree) + "/" + str(len(specs)),
+                                               nusmv_time, explicit_time))
+
+    print("\n" + str(disagreements) + " disagreements")
+    sys.exit(1 if disagreements else 0)
@@ -1,5 +1,6 @@
 from src.patterns import *
 from src.context import *
+from LTL_contracts.src.scheduler import CheckScheduler, PASSED
 
 sys.path.append(os.path.join(os.getcwd(), os.path.pardir))
 
@@ -32,23 +33,23 @@ def visit_with_conflict_example():
     glob_avoidance = GlobalAvoidance("avoid", "b")
 
     contract_list = [ordered_visit, glob_avoidance]
-    contracts = Contracts(contract_list)
 
-    checks = Checks()
-    checks.add_check(Compatibility("composition", contract_list))
-    checks.add_check(Consistency("composition", contract_list))
+    # compatibility and consistency run concurrently, the composition only if both pass
+    scheduler = CheckScheduler()
+    scheduler.add_check("compatibility", Compatibility("composition", contract_list))
+    scheduler.add_check("consistency", Consistency("composition", contract_list))
+    scheduler.add_action("composition", lambda: composition(contract_list), after=["compatibility", "consistency"])
 
-    generate(contracts, checks, smv_file)
-    results = run(smv_file, checks)
+    outcomes = scheduler.run()
 
-    print(results)
-    if not results[0]:
+    print(outcomes)
+    if outcomes["compatibility"].status != PASSED:
         print("The mission is not compatible, fix the assumptions")
-    if not results[1]:
+    if outcomes["consistency"].status != PASSED:
         print("The mission is not consistent")
-    elif results[0] and results[1]:
+    elif outcomes["composition"].status == PASSED:
         print("The mission specified is compatible and consistent, composing now..")
-        mission = composition(contract_list)
+        mission = outcomes["composition"].value
         print(mission)
 
 
@@ -0,0 +1,12 @@
+from src.patterns import *
+
+
+def mission(size):
+    """Returns size contracts alternating ordered visits and delayed reactions"""
+    contracts = []
+    for i in range(size):
+        if i % 2 == 0:
+            contracts.append(OrderedVisit("visit_" + str(i), ("loc" + str(i), "loc" + str(i + 1))))
+        else:
+            contracts.append(DelayedReaction("react_" + str(i), "loc" + str(i), "action" + str(i)))
+    return contracts
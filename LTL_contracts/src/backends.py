@@ -0,0 +1,263 @@
+"""Backends module defines the interface of the verification engines, the registry of the available ones and the
+router choosing the engine of each check from cheap features of its LTL specification
+
+The model checkers running in a separate process are defined and registered by the core module, this module only
+holds the engines running in process."""
+
+import abc, re
+from collections import OrderedDict, namedtuple
+from LTL_contracts.src import formula as ltl
+from LTL_contracts.src import propositional, explicit, bmc, intervals
+from LTL_contracts.src.check import verdict_result
+
+RANGE = re.compile(r'^\s*-?\d+\s*\.\.\s*-?\d+\s*$')
+
+# backends by name, in order of registration
+registry = OrderedDict()
+
+# features of an LTL specification used for routing: the nesting depth of the temporal operators, the number of
+# referenced variables and of integer and real ones, the number of maximal temporal-free subformulas, whether the
+# specification has no temporal operators and whether it may require something to eventually happen
+Features = namedtuple('Features', ['temporal_depth', 'variables', 'integers', 'reals', 'propositions',
+                                   'propositional', 'liveness'])
+
+# routing decision of a check: the check, the backend it was sent to, its features and why that backend was chosen
+Decision = namedtuple('Decision', ['check', 'backend', 'features', 'reason'])
+
+
+class Backend(abc.ABC):
+    """Backend is a base class for the verification engines
+
+    Attributes:
+        name: a string name identifying the backend in the registry
+        external: a boolean, True if the backend runs a model checker in a separate process
+    """
+
+    name = None
+    external = False
+
+    @abc.abstractmethod
+    def decide(self, variables, checks, smvfile, stop_on_failure=False, witnesses=True):
+        """Decides the checks
+
+        Args:
+            variables: variables involved in the checks
+            checks: a checks object
+            smvfile: a string name for the model file, if the backend needs one
+            stop_on_failure: a boolean, if True the backend may stop at the first check whose result is False
+            witnesses: a boolean, if False the backend does not need to build counterexamples
+
+        Returns:
+            A list of results, in the same format of the list returned by core.run, checks the backend cannot
+            decide have result None
+        """
+        pass
+
+
+class InProcess(Backend):
+    """InProcess is a base class for the engines deciding one specification at a time inside the tool"""
+
+    @abc.abstractmethod
+    def holds(self, variables, spec):
+        """Returns whether spec holds, raising propositional.Unsupported when the engine cannot tell"""
+        pass
+
+    def decide(self, variables, checks, smvfile, stop_on_failure=False, witnesses=True):
+        results = []
+        for check in checks.checks:
+            try:
+                with propositional.z3_lock:
+                    results.append(verdict_result(check.check_type, self.holds(variables, check.get_ltl())))
+            except propositional.Unsupported:
+                results.append(None)
+            if stop_on_failure and results[-1] is False:
+                break
+        return results + [None] * (len(checks.checks) - len(results))
+
+
+class Propositional(InProcess):
+    """Decides the specifications without temporal operators by Z3 validity over the variable domains"""
+
+    name = 'propositional'
+
+    def holds(self, variables, spec):
+        return propositional.holds(variables, spec)
+
+
+class Intervals(InProcess):
+    """Decides the specifications over ranged integers and booleans with G and F over temporal-free formulas by
+    evaluating them on every state at once, the temporal-free ones outside this fragment are decided with Z3"""
+
+    name = 'intervals'
+
+    def holds(self, variables, spec):
+        try:
+            return intervals.holds(variables, spec)
+        except propositional.Unsupported:
+            if not propositional.is_propositional(spec):
+                raise
+            return propositional.holds(variables, spec)
+
+
+class Explicit(InProcess):
+    """Decides the specifications with few propositions by emptiness of the automaton of their negation"""
+
+    name = 'explicit'
+
+    def holds(self, variables, spec):
+        return explicit.holds(variables, spec)
+
+
+class Bounded(InProcess):
+    """Refutes the specifications with a counterexample of at most bound steps
+
+    Attributes:
+        bound: the maximum index of the last state of the counterexamples
+    """
+
+    name = 'bmc'
+
+    def __init__(self, bound=bmc.DEFAULT_BOUND):
+        self.bound = bound
+
+    def holds(self, variables, spec):
+        return bmc.holds(variables, spec, self.bound)
+
+
+def register(backend):
+    """Adds backend to the registry, replacing the backend with the same name"""
+    registry[backend.name] = backend
+
+
+def get(name):
+    """Returns the registered backend called name"""
+    if name not in registry:
+        raise KeyError('unknown backend ' + name + ', registered ones are ' + ', '.join(registry))
+    return registry[name]
+
+
+for _backend in (Propositional(), Intervals(), Explicit(), Bounded()):
+    register(_backend)
+
+
+def features(variables, spec):
+    """Returns the Features of an LTL specification
+
+    Args:
+        variables: variables declared in the model of the specification
+        spec: a formula object
+
+    Returns:
+        A Features tuple
+    """
+    types = dict(variables)
+    names = ltl.atoms(spec) & set(types)
+    depths, temporal_free = {}, {}
+    for node in ltl.postorder(spec):
+        temporal = node.op in ltl.TEMPORAL_UNARY + ltl.TEMPORAL_BINARY
+        depths[node] = max([depths[child] for child in node.children()] + [0]) + (1 if temporal else 0)
+        temporal_free[node] = not temporal and node.op != 'raw' and \
+            all(temporal_free[child] for child in node.children())
+
+    propositions = set()
+    for node in ltl.postorder(spec):
+        if not temporal_free[node]:
+            propositions.update(child for child in node.children() if temporal_free[child])
+    if temporal_free[spec]:
+        propositions.add(spec)
+
+    return Features(temporal_depth=depths[spec],
+                    variables=len(names),
+                    integers=len([name for name in names if RANGE.match(types[name]) or
+                                  types[name].strip() == 'integer']),
+                    reals=len([name for name in names if types[name].strip() == 'real']),
+                    propositions=len(propositions),
+                    propositional=temporal_free[spec],
+                    liveness=_is_liveness(spec))
+
+
+def _is_liveness(spec):
+    """Returns True if spec is not syntactically a safety property, that is if an F or a U occurs under an even
+    number of negations or a G or a V under an odd number, opaque text is conservatively assumed to be liveness"""
+    visited = set()
+    stack = [(spec, True)]
+    while stack:
+        node, positive = stack.pop()
+        if (node, positive) in visited:
+            continue
+        visited.add((node, positive))
+        if node.op == 'raw' or node.op in (('F', 'U') if positive else ('G', 'V')):
+            return True
+        if node.op == '!':
+            stack.append((node.args[0], not positive))
+        elif node.op == '->':
+            stack.extend([(node.args[0], not positive), (node.args[1], positive)])
+        elif node.op in ('<->', 'xor', 'xnor'):
+            stack.extend((child, polarity) for child in node.args for polarity in (True, False))
+        else:
+            stack.extend((child, positive) for child in node.children())
+    return False
+
+
+def is_interval(features):
+    """Returns True if the features are those of a specification the intervals backend is meant for, one over
+    integer variables and no real ones, without nested temporal operators"""
+    return features.integers > 0 and features.reals == 0 and features.temporal_depth <= 1
+
+
+class Router(object):
+    """Router picks the backend of each check with the first matching rule, and records every decision
+
+    Attributes:
+        rules: a list of (backend name, predicate) pairs, the predicate takes the Features of a specification
+        default: the name of the backend of the checks matching no rule, and of those the chosen backend cannot
+            decide
+        decisions: a list of the Decision taken so far
+    """
+
+    def __init__(self, rules=(), default='nusmv'):
+        """Initialize a router"""
+        self.rules = list(rules)
+        self.default = default
+        self.decisions = []
+
+    def route(self, variables, check):
+        """Returns the name of the backend for check and records the decision
+
+        Args:
+            variables: variables involved in the check
+            check: a check object
+        """
+        spec_features = features(variables, check.get_ltl())
+        for position, (name, predicate) in enumerate(self.rules):
+            if predicate(spec_features):
+                return self.record(check, name, spec_features, 'rule ' + str(position))
+        return self.record(check, self.default, spec_features, 'default')
+
+    def record(self, check, name, spec_features, reason):
+        """Records the decision of sending check to the backend called name and returns name"""
+        self.decisions.append(Decision(check, name, spec_features, reason))
+        return name
+
+    def summary(self):
+        """Returns a dictionary mapping each backend name to the number of checks routed to it"""
+        counts = OrderedDict()
+        for decision in self.decisions:
+            counts[decision.backend] = counts.get(decision.backend, 0) + 1
+        return counts
+
+
+# rules of the automatic router: specifications over integers without nested temporal operators are decided by
+# interval evaluation, temporal-free specifications with Z3, the ones with few propositions by the explicit-state
+# engine, safety properties over numeric variables by IC3 in nuXmv and the rest by NuSMV
+AUTOMATIC_RULES = [
+    ('intervals', is_interval),
+    ('propositional', lambda features: features.propositional),
+    ('explicit', lambda features: features.propositions <= explicit.MAX_PROPOSITIONS // 2),
+    ('nuxmv', lambda features: (features.integers or features.reals) and not features.liveness),
+]
+
+
+def automatic_router():
+    """Returns a router with the AUTOMATIC_RULES, falling back to NuSMV"""
+    return Router(AUTOMATIC_RULES)
@@ -0,0 +1,163 @@
+"""BMC module searches counterexamples of LTL specifications with Z3, unrolling them over lasso-shaped paths of
+increasing length
+
+The generated models have no INIT, ASSIGN or TRANS section, so every sequence of assignments of the declared
+variables is a path and every path can loop back to any of its states: a counterexample of length k is k + 1
+assignments and the position its last state loops back to. The bound is deepened in a single solver, the domain
+constraints of the unrolled states stay asserted and only the specification at the current bound is pushed and
+popped."""
+
+import z3
+from LTL_contracts.src import formula as ltl
+from LTL_contracts.src.propositional import Encoder, Unsupported, is_propositional
+from LTL_contracts.src.trace import Trace
+
+DEFAULT_BOUND = 10
+
+
+class Inconclusive(Unsupported):
+    """Raised when no counterexample exists up to the bound, which does not prove that a specification holds"""
+    pass
+
+
+class Unrolling(object):
+    """Unrolling encodes a formula over the states of the lasso-shaped paths of a bounded length
+
+    Attributes:
+        variables: variables involved in the formula
+        encoders: a list with the encoder of the variables of each state, their Z3 names end with @ and the state
+        solver: a Z3 solver holding the domain constraints of the states encoded so far
+    """
+
+    def __init__(self, variables):
+        """Initialize an unrolling with no states"""
+        self.variables = variables
+        self.encoders = []
+        self.solver = z3.Solver()
+        self.asserted = []
+
+    def state(self, i):
+        """Returns the encoder of state i, creating the states up to i if needed"""
+        while len(self.encoders) <= i:
+            self.encoders.append(Encoder(self.variables, '@' + str(len(self.encoders))))
+            self.asserted.append(0)
+        return self.encoders[i]
+
+    def encode(self, formula, bound, loop):
+        """Encodes formula at the first state of the paths of bound + 1 states whose last state loops back to loop
+
+        Args:
+            formula: a formula object
+            bound: the index of the last state
+            loop: the index of the state following the last one
+
+        Returns:
+            A Z3 expression
+        """
+        positions = range(bound + 1)
+        successor = [i + 1 for i in range(bound)] + [loop]
+        values = {}
+        for node in ltl.postorder(formula):
+            op = node.op
+            args = [values[child] for child in node.children()]
+            if op == 'X':
+                values[node] = [args[0][successor[i]] for i in positions]
+            elif op == 'G':
+                values[node] = [z3.And(args[0][min(i, loop):]) for i in positions]
+            elif op == 'F':
+                values[node] = [z3.Or(args[0][min(i, loop):]) for i in positions]
+            elif op in ('U', 'V'):
+                # a V b is !(!a U !b)
+                left, right = args if op == 'U' else [[z3.Not(value) for value in arg] for arg in args]
+                until = [_until(left, right, i, loop) for i in positions]
+                values[node] = until if op == 'U' else [z3.Not(value) for value in until]
+            elif op in ltl.TEMPORAL_UNARY + ltl.TEMPORAL_BINARY or op == 'raw':
+                raise Unsupported('operator ' + op + ' in ' + str(formula))
+            else:
+                values[node] = [self.state(i).encode_node(node, [arg[i] for arg in args]) for i in positions]
+        return values[formula][0]
+
+    def assert_domains(self):
+        """Asserts the domain constraints of the variables encoded since the last call"""
+        for encoder, asserted in zip(self.encoders, self.asserted):
+            self.solver.add(encoder.constraints[asserted:])
+        self.asserted = [len(encoder.constraints) for encoder in self.encoders]
+
+    def trace(self, model, bound, loop):
+        """Returns the path of a model as a Trace, in the same format of the NuSMV counterexamples"""
+        names = dict((code, value) for value, code in self.state(0).constants.items())
+        lines = []
+        for i in range(bound + 1):
+            if i == loop:
+                lines.append('  -- Loop starts here')
+            lines.append('  -> State: 1.' + str(i + 1) + ' <-')
+            for name, term in sorted(self.state(i).terms.items()):
+                value = model.eval(term, model_completion=True)
+                if self.state(i).variables[name].strip().startswith('{'):
+                    value = names[value.as_long()]
+                elif z3.is_bool(value):
+                    value = 'TRUE' if z3.is_true(value) else 'FALSE'
+                lines.append('    ' + name + ' = ' + str(value))
+        return Trace(lines)
+
+
+def _until(left, right, i, loop):
+    """Returns a U b at position i of a lasso, given the values of a and b at every position"""
+    bound = len(left) - 1
+    options = [z3.And([right[j]] + left[i:j]) for j in range(i, bound + 1)]
+    options += [z3.And([right[j]] + left[i:] + left[loop:j]) for j in range(loop, i)]
+    return z3.Or(options)
+
+
+def counterexample(variables, formula, bound=DEFAULT_BOUND):
+    """Searches the shortest path of at most bound + 1 states that violates formula
+
+    Args:
+        variables: variables involved in the specification
+        formula: a formula object
+        bound: the maximum index of the last state of the path
+
+    Returns:
+        A Trace violating formula, None if there is none up to bound
+
+    Raises:
+        Unsupported: if formula or a variable type is outside the supported fragment
+    """
+    unrolling = Unrolling(variables)
+    negated = ltl.Not(formula)
+    try:
+        for k in range(bound + 1):
+            loops = z3.Int('loop@' + str(k))
+            violation = z3.Or([z3.And(loops == loop, unrolling.encode(negated, k, loop)) for loop in range(k + 1)])
+            unrolling.assert_domains()
+            unrolling.solver.push()
+            unrolling.solver.add(violation)
+            if unrolling.solver.check() == z3.sat:
+                model = unrolling.solver.model()
+                return unrolling.trace(model, k, model.eval(loops).as_long())
+            unrolling.solver.pop()
+    except z3.Z3Exception as error:
+        raise Unsupported('ill-typed formula ' + str(formula) + ': ' + str(error))
+    return None
+
+
+def holds(variables, formula, bound=DEFAULT_BOUND):
+    """Decides whether an LTL specification holds, by searching a counterexample up to bound
+
+    Args:
+        variables: variables involved in the specification
+        formula: a formula object
+        bound: the maximum index of the last state of the counterexamples
+
+    Returns:
+        False if a counterexample exists, True if formula has no temporal operator and none exists
+
+    Raises:
+        Inconclusive: if formula has temporal operators and no counterexample exists up to bound
+        Unsupported: if formula or a variable type is outside the supported fragment
+    """
+    if counterexample(variables, formula, 0 if is_propositional(formula) else bound) is not None:
+        return False
+    if is_propositional(formula):
+        return True
+    raise Inconclusive('no counterexample of ' + str(formula) + ' up to bound ' + str(bound))
@@ -0,0 +1,111 @@
+"""Cache module stores the verdicts of the LTL checks on disk, addressed by the content of the checked model"""
+
+import os, sqlite3, hashlib, threading
+from LTL_contracts.src.formula import to_smv
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'cogomo', 'verdicts.sqlite')
+DEFAULT_MAX_ENTRIES = 100000
+
+
+class VerdictCache(object):
+    """VerdictCache is a size-bounded, least recently used, persistent map from checks to their results
+
+    Attributes:
+        path: a string name of the sqlite file holding the cache
+        max_entries: the maximum number of verdicts kept, the least recently used ones are evicted first
+        enabled: a boolean, when False every lookup misses and nothing is stored
+        hits, misses, stores, evictions: counters of the cache activity since it was opened
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES):
+        """Initialize a verdict cache, creating the sqlite file if needed"""
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, result INTEGER, used INTEGER)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS verdicts_used ON verdicts (used)')
+        self.db.commit()
+        self.clock = self.db.execute('SELECT COALESCE(MAX(used), 0) FROM verdicts').fetchone()[0]
+
+    @staticmethod
+    def key(variables, check):
+        """Returns the content address of a check
+
+        Args:
+            variables: variables declared in the model of the check
+            check: a check object
+
+        Returns:
+            A hex digest of the check type, the serialized LTL specification and the variable declarations
+        """
+        ltl = to_smv(check.get_ltl())
+        declarations = sorted(var + ': ' + type + ';' for (var, type) in set(variables))
+        content = check.check_type + '\n' + ltl + '\n' + '\n'.join(declarations)
+        return hashlib.sha256(content.encode('UTF-8')).hexdigest()
+
+    def get(self, key):
+        """Returns the cached result for key, or None if it is not cached"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            row = self.db.execute('SELECT result FROM verdicts WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.clock += 1
+            self.db.execute('UPDATE verdicts SET used = ? WHERE key = ?', (self.clock, key))
+            self.db.commit()
+            return bool(row[0])
+
+    def put(self, key, result):
+        """Stores the result for key, evicting the least recently used verdicts above max_entries"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.clock += 1
+            self.db.execute('INSERT OR REPLACE INTO verdicts (key, result, used) VALUES (?, ?, ?)',
+                            (key, int(result), self.clock))
+            self.stores += 1
+            excess = self._entries() - self.max_entries
+            if excess > 0:
+                self.db.execute('DELETE FROM verdicts WHERE key IN '
+                                '(SELECT key FROM verdicts ORDER BY used LIMIT ?)', (excess,))
+                self.evictions += excess
+            self.db.commit()
+
+    def clear(self):
+        """Removes every cached verdict"""
+        with self.lock:
+            self.db.execute('DELETE FROM verdicts')
+            self.db.commit()
+
+    def stats(self):
+        """Returns a dictionary with the counters of the cache activity and its current size"""
+        with self.lock:
+            entries = self._entries()
+        lookups = self.hits + self.misses
+        return {'entries': entries,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+                'stores': self.stores,
+                'evictions': self.evictions}
+
+    def close(self):
+        """Closes the sqlite file"""
+        self.db.close()
+
+    def _entries(self):
+        """Returns the number of cached verdicts"""
+        return self.db.execute('SELECT COUNT(*) FROM verdicts').fetchone()[0]
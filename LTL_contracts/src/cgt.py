@@ -14,6 +14,9 @@ class Cgt(Contract):
         contracts: a list of contract objects
         alphabet: a list of tuples containing the shared alphabet among all contracts
     """
+
+    __slots__ = ('sub_cgts', 'sub_operation', 'parent_cgt', 'parent_operation')
+
     def __init__(self):
         """Initialize a contracts object"""
 
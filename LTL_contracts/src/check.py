@@ -1,6 +1,18 @@
 """Check module defines a check class that links contracts to a pre-defined check type"""
 from collections import OrderedDict
 from LTL_contracts.src import operations as ops
+from LTL_contracts.src import formula as ltl
+
+
+def verdict_result(check_type, holds):
+    """Returns the result of a check given whether its LTL specification holds
+
+    Refinement and inclusion hold when their specification is true, satisfiability, compatibility and consistency
+    specifications are negated so they hold when it is false.
+    """
+    if check_type in ('refinement', 'inclusion'):
+        return holds
+    return not holds
 
 
 class Check(object):
@@ -82,17 +94,17 @@ class Inclusion:
     """
     def __init__(self, aprop=None, bprop=None):
         self.check_type = 'inclusion'
-        self.aprop = aprop
-        self.bprop = bprop
+        self.aprop = ltl.lift(aprop) if aprop is not None else None
+        self.bprop = ltl.lift(bprop) if bprop is not None else None
 
     def get_ltl(self):
-        """Returns the LTL statement for the inclusion"""
+        """Returns the LTL formula for the inclusion"""
         return ops.inclusion(self.aprop, self.bprop)
 
     def __str__(self):
         """Override the print behavior"""
         astr = self.check_type + ': {\n'
-        astr += '\naprop : [' + self.aprop + ']\nis included in\nbprop : [' + self.bprop + ']\n}'
+        astr += '\naprop : [' + str(self.aprop) + ']\nis included in\nbprop : [' + str(self.bprop) + ']\n}'
         return astr
 
 
@@ -112,7 +124,7 @@ class Compatibility(Check):
         self.comp_type = comp_type
 
     def get_ltl(self):
-        """Returns the LTL statement for the compatibility of two contracts"""
+        """Returns the LTL formula for the compatibility of two contracts"""
         if self.comp_type == 'composition':
             contract = ops.composition(self.contracts.values())
         else:
@@ -146,7 +158,7 @@ class Consistency(Check):
         self.cons_type = cons_type
 
     def get_ltl(self):
-        """Returns the LTL statement for the consistency of two contracts"""
+        """Returns the LTL formula for the consistency of two contracts"""
         if self.cons_type == 'composition':
             contract = ops.composition(self.contracts.values())
         else:
@@ -176,12 +188,10 @@ class Satisfiability(Check):
         self.check_type = 'satisfiability'
 
     def get_ltl(self):
-        """Returns the LTL statement for the satisfiability of the contract"""
-        formula = ""
-        for i, contract in enumerate(self.contracts.values()):
+        """Returns the LTL formula for the satisfiability of the contract"""
+        formula = None
+        for contract in self.contracts.values():
             formula = ops.satisfiability(contract)
-            if i < len(self.contracts.values()) - 1:
-                formula += '\n'
         return formula
 
     def __str__(self):
@@ -204,9 +214,10 @@ class Refinement(Check):
         self.check_type = 'refinement'
 
     def get_ltl(self):
-        """Returns the LTL statement to check if contract_a refines contract_b"""
+        """Returns the LTL formula to check if contract_a refines contract_b"""
         # (TODO) remove hard-coded contract parameters
-        return ops.refinement(self.contracts.values()[0], self.contracts.values()[1])
+        contracts = list(self.contracts.values())
+        return ops.refinement(contracts[0], contracts[1])
 
     def __str__(self):
         """Override the print behavior"""
@@ -20,6 +20,9 @@ class Context(Cgt):
     """
     General Context Class
     """
+
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__()
         self.name = name
@@ -32,6 +35,8 @@ class Robot(Context):
     Visit a set of locations in an unspecified order.
     """
 
+    __slots__ = ()
+
     def __init__(self, name, weight_power=None):
         """
         :type lifting_power:
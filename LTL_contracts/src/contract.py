@@ -1,24 +1,71 @@
 """Contract module defines a contract class to store contract data attributes and a contracts class
 to store all system contracts and overall system alphabet"""
 
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from LTL_contracts.src import formula as ltl
+
+# declarations shared by all contracts, each distinct (variable, type) tuple is stored once
+_declarations = {}
+
+
+def _declaration(variable):
+    """Returns the shared tuple equal to variable"""
+    variable = tuple(variable)
+    return _declarations.setdefault(variable, variable)
+
+
+def _field(slot, doc, share=None):
+    """Returns a property keeping a sequence as a tuple in slot, discarding the cached fingerprint when it is set,
+    share maps each element to its shared copy"""
+    def get(self):
+        return getattr(self, slot)
+
+    def set(self, values):
+        setattr(self, slot, tuple(values) if share is None else tuple(share(value) for value in values))
+        self._fingerprint = None
+    return property(get, set, doc=doc)
+
 
 class Contract(object):
     """Contract class stores data attributes of a contract
 
+    The attributes are tuples of shared declarations and of interned formulas, and the structural fingerprint of
+    the contract is computed once and kept until an attribute changes, so unequal contracts are told apart in
+    constant time. Contracts hash by their fingerprint, consistently with equality, so equal contracts are the same
+    key; a contract must not be changed while it is in a set or a dictionary.
+
     Attributes:
         name: a string name for the contract
-        variables: a list of tuples containing string variables and initial values
-        assumptions: a list of string relations assumed by contract
-        guarantees: a list of string relations guaranteed by contract
+        variables: a tuple of tuples containing string variables and initial values
+        assumptions: a tuple of formula relations assumed by contract
+        guarantees: a tuple of formula relations guaranteed by contract
     """
+
+    __slots__ = ('_name', '_variables', '_assumptions', '_assumptions_orneg', '_guarantees', '_fingerprint')
+
+    variables = _field('_variables', 'a tuple of tuples containing string variables and initial values',
+                       _declaration)
+    assumptions = _field('_assumptions', 'a tuple of formula relations assumed by contract')
+    assumptions_orneg = _field('_assumptions_orneg', 'a tuple of formula relations whose negation is assumed')
+    guarantees = _field('_guarantees', 'a tuple of formula relations guaranteed by contract')
+
     def __init__(self):
         """Initialize a contract object"""
         self.name = ''
-        self.variables = []
-        self.assumptions = []
-        self.assumptions_orneg = []
-        self.guarantees = []
+        self.variables = ()
+        self.assumptions = ()
+        self.assumptions_orneg = ()
+        self.guarantees = ()
+
+    @property
+    def name(self):
+        """a string name for the contract"""
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        self._fingerprint = None
 
     def add_name(self, name):
         """Assigns the contract a name
@@ -42,7 +89,7 @@ class Contract(object):
         Args:
             variable: a tuple containing a variable and its type
         """
-        self.variables.append(variable)
+        self.variables = self._variables + (variable,)
 
     def add_variables(self, variables):
         """Adds a list of variables to the contract variables
@@ -50,90 +97,87 @@ class Contract(object):
         Args:
             variables: a list of tuples containing variables and initial values
         """
-        for variable in variables:
-            self.variables.append(variable)
+        self.variables = self._variables + tuple(variables)
 
     def add_assumption(self, assumption):
         """Adds an assumption to the contract assumptions
 
         Args:
-            assumption: a string assumption
+            assumption: a string or formula assumption
         """
-        if "TRUE" in self.assumptions: self.assumptions.remove("TRUE")
-        self.assumptions.append(assumption)
+        assumptions = tuple(a for a in self._assumptions if a is not ltl.TRUE)
+        self.assumptions = assumptions + (ltl.lift(assumption),)
 
     def add_assumptions(self, assumptions):
         """Adds an assumption to the contract assumptions
 
         Args:
-            assumptions: a list of string assumption
+            assumptions: a list of string or formula assumption
         """
-        for assumption in assumptions:
-            self.assumptions.append(assumption)
+        self.assumptions = self._assumptions + tuple(ltl.lift(assumption) for assumption in assumptions)
 
     def add_assumptions_orneg(self, assumptions):
         """Adds an assumption to the contract assumptions
 
         Args:
-            assumptions: a list of string assumption
+            assumptions: a list of string or formula assumption
         """
-        for assumption in assumptions:
-            self.assumptions_orneg.append(assumption)
+        self.assumptions_orneg = self._assumptions_orneg + tuple(ltl.lift(assumption)
+                                                                  for assumption in assumptions)
 
 
     def add_guarantee(self, guarantee):
         """Adds a guarantee to the contract guarantees
 
         Args:
-            guarantee: a string guarantee
+            guarantee: a string or formula guarantee
         """
-        self.guarantees.append(guarantee)
+        self.guarantees = self._guarantees + (ltl.lift(guarantee),)
 
     def add_guarantees(self, guarantees):
         """Adds a guarantees to the contract guarantees
 
         Args:
-            guarantee: a list of string guarantee
+            guarantee: a list of string or formula guarantee
         """
+        added = []
         for guarantee in guarantees:
-            if isinstance(guarantee, list):
-                for g in guarantee:
-                    self.guarantees.append(g)
+            if isinstance(guarantee, (list, tuple)):
+                added.extend(ltl.lift(g) for g in guarantee)
             else:
-                self.guarantees.append(guarantee)
+                added.append(ltl.lift(guarantee))
+        self.guarantees = self._guarantees + tuple(added)
 
     def get_assumptions(self):
-        """Get a concatenated string of all assumptions
+        """Get the conjunction of all assumptions
 
         Returns:
-            A parenthesized, concatenated string of assumptions
+            A formula, the conjunction of the assumptions
         """
-        assumptions = [assumption + ' & ' for assumption in self.assumptions]
-        return '(' + ''.join(assumptions)[:-3] + ')'
+        return ltl.And(*self.assumptions)
 
     def get_assumptions_list(self):
-        """Get a concatenated string of all assumptions
+        """Get the list of all assumptions
 
         Returns:
-            A parenthesized, concatenated string of assumptions
+            A list of formula assumptions
         """
-        return self.assumptions
+        return list(self._assumptions)
 
     def get_guarantees(self):
-        """Get a concatenated string of all guarantees
+        """Get the conjunction of all guarantees
 
         Returns:
-            A parenthesized, concatenated string of guarantees
+            A formula, the conjunction of the guarantees
         """
-        guarantees = [guarantee + ' & ' for guarantee in self.guarantees]
-        return '(' + ''.join(guarantees)[:-3] + ')'
+        return ltl.And(*self.guarantees)
 
     def get_guarantees_list(self):
-        return self.guarantees
+        return list(self._guarantees)
 
 
     def get_variables(self):
-        return self.variables
+        return list(self._variables)
 
     def is_full(self):
         """Check if contract parameters are filled
@@ -146,8 +190,7 @@ class Contract(object):
     def saturate_guarantees(self):
         """Helper function that saturates each guarantee with contract assumptions"""
         assumptions = self.get_assumptions()
-        self.guarantees = ['(' + assumptions + ' -> ' +
-                           guarantee + ')' for guarantee in self.guarantees]
+        self.guarantees = [ltl.Implies(assumptions, guarantee) for guarantee in self.guarantees]
 
     def __str__(self):
         """Override the print behavior"""
@@ -157,39 +200,193 @@ class Contract(object):
             astr += '(' + var + ' := ' + init + '), '
         astr = astr[:-2] + ' ]\n  assumptions: [ '
         for assumption in self.assumptions:
-            astr += assumption + ' & '
+            astr += str(assumption) + ' & '
         astr = astr[:-2]
         if len(self.assumptions_orneg) > 0:
             astr += '| !( '
             for assumptions_orneg in self.assumptions_orneg:
-                astr += assumptions_orneg + ' & '
+                astr += str(assumptions_orneg) + ' & '
             astr = astr[:-2] + ')'
         astr += ' ]\n  guarantees: [ '
         for guarantee in self.guarantees:
-            astr += guarantee + ' & '
+            astr += str(guarantee) + ' & '
         return astr[:-2] + ' ]\n]'
 
+    def _key(self):
+        """Returns the tuple of the attributes defining the contract"""
+        return self._name, self._variables, self._assumptions, self._assumptions_orneg, self._guarantees
+
+    def fingerprint(self):
+        """Returns the structural hash of the contract, computed once and changed whenever the contract changes"""
+        if self._fingerprint is None:
+            self._fingerprint = hash(self._key())
+        return self._fingerprint
+
+    def __hash__(self):
+        """Returns the fingerprint of the contract, equal contracts have the same one"""
+        return self.fingerprint()
+
+    def _extra(self):
+        """Returns the dictionary of the attributes declared in the slots of the subclasses"""
+        return {slot: getattr(self, slot, None) for cls in type(self).__mro__ if cls is not Contract
+                for slot in cls.__dict__.get('__slots__', ())}
+
     def __eq__(self, other):
         """Override the default Equals behavior"""
+        if self is other:
+            return True
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return (self.fingerprint() == other.fingerprint() and self._key() == other._key()
+                    and self._extra() == other._extra())
+        return False
+
+    def __ne__(self, other):
+        """Define a non-equality test"""
+        return not self.__eq__(other)
+
+    def __getstate__(self):
+        """The fingerprint is not pickled, it depends on the hash seed of the process"""
+        return self._key(), self._extra()
+
+    def __setstate__(self, state):
+        """Restores a pickled contract"""
+        (self.name, self.variables, self.assumptions, self.assumptions_orneg, self.guarantees), attributes = state
+        for slot, value in attributes.items():
+            setattr(self, slot, value)
+
+# a variable declared with two incompatible types: its name, the type it was first declared with, the other type
+# and the name of the contract declaring it, None if not added with a contract
+Conflict = namedtuple('Conflict', ['variable', 'declared', 'redeclared', 'contract'])
+
+
+class Alphabet(object):
+    """Alphabet is an incremental index of the variables declared by a set of contracts
+
+    Each variable is declared once, in order of first occurrence. Declarations of the same variable as different
+    enumerations are merged into the union of their values, any other declaration with a different type is a
+    conflict: it is recorded and the first declaration is kept. Enumeration values share the namespace of the
+    variables, so a variable named as a value of an enumeration is a conflict too.
+
+    Attributes:
+        types: an ordered dictionary mapping each variable to its type
+        users: a dictionary mapping each variable to an ordered dictionary whose keys are the names of the
+            contracts declaring it
+        conflicts: a list of the Conflict found so far
+        enumerations: a dictionary mapping each enumeration variable to the list and the set of its values
+        constants: a dictionary mapping each enumeration value to the first variable taking it
+    """
+    def __init__(self, variables=(), owner=None):
+        """Initialize an alphabet with variables, declared by the contract called owner"""
+        self.types = OrderedDict()
+        self.users = {}
+        self.conflicts = []
+        self.enumerations = {}
+        self.constants = {}
+        self.add(variables, owner)
+
+    def add(self, variables, owner=None):
+        """Adds variables to the alphabet
+
+        Args:
+            variables: a list of tuples containing variables and their types
+            owner: the name of the contract declaring the variables
+        """
+        for (var, type) in variables:
+            declared = self.types.get(var)
+            if declared is None:
+                if var in self.constants:
+                    self.conflicts.append(Conflict(var, self.types[self.constants[var]], type, owner))
+                self.types[var] = type
+                self.users[var] = OrderedDict()
+                if _is_enumeration(type):
+                    values = _enumeration_values(type)
+                    self.enumerations[var] = (values, set(values))
+                    self._add_constants(var, values, owner)
+            elif declared != type:
+                if var in self.enumerations and _is_enumeration(type):
+                    values, known = self.enumerations[var]
+                    added = [value for value in _enumeration_values(type) if value not in known]
+                    if added:
+                        values += added
+                        known.update(added)
+                        self.types[var] = '{' + ', '.join(values) + '}'
+                        self._add_constants(var, added, owner)
+                elif declared.strip() != type.strip():
+                    self.conflicts.append(Conflict(var, declared, type, owner))
+            if owner is not None:
+                self.users[var][owner] = True
+
+    def _add_constants(self, var, values, owner):
+        """Records the values of the enumeration variable var, and a conflict for each one naming a variable"""
+        for value in values:
+            self.constants.setdefault(value, var)
+            if value in self.types:
+                self.conflicts.append(Conflict(value, self.types[value], self.types[var], owner))
+
+    def items(self):
+        """Returns the list of tuples containing the variables and their types"""
+        return list(self.types.items())
+
+    def contracts_using(self, var):
+        """Returns the list of the names of the contracts declaring var"""
+        return list(self.users[var]) if var in self.users else []
+
+    def __contains__(self, var):
+        return var in self.types
+
+    def __len__(self):
+        return len(self.types)
+
+    def __eq__(self, other):
+        """Override the default Equals behavior"""
+        if isinstance(other, self.__class__):
+            return self.types == other.types and self.users == other.users
         return False
 
     def __ne__(self, other):
         """Define a non-equality test"""
         return not self.__eq__(other)
 
+
+def merge_variables(*lists):
+    """Merges lists of variables keeping the first occurrence order and removing duplicates
+
+    Declarations of the same variable as different enumerations are merged into the union of their values, of other
+    conflicting declarations only the first one is kept.
+
+    Args:
+        lists: lists of tuples containing variables and their types
+
+    Returns:
+        A list of tuples containing variables and their types
+    """
+    alphabet = Alphabet()
+    for variables in lists:
+        alphabet.add(variables)
+    return alphabet.items()
+
+
+def _is_enumeration(type):
+    """Returns True if the type is a NuSMV enumeration"""
+    return type.strip().startswith('{')
+
+
+def _enumeration_values(type):
+    """Returns the list of values of a NuSMV enumeration type"""
+    return [value.strip() for value in type.strip()[1:-1].split(',') if value.strip()]
+
+
 class Contracts(object):
     """Contracts class stores all contracts for a system and the shared alphabet
 
     Attributes:
         contracts: a list of contract objects
-        alphabet: a list of tuples containing the shared alphabet among all contracts
+        index: an Alphabet of the variables of all contracts
     """
     def __init__(self, contract_list=None):
         """Initialize a contracts object"""
         self.contracts = OrderedDict()
-        self.alphabet = []
+        self.index = Alphabet()
 
         if contract_list is not None:
             for contract in contract_list:
@@ -202,7 +399,7 @@ class Contracts(object):
             contract: a contract object
         """
         self.contracts[contract.name] = contract
-        self.alphabet = list(set(self.alphabet) | set(contract.variables))
+        self.index.add(contract.variables, contract.name)
 
     def get_contract(self, name):
         """Get the contract with the specified name
@@ -228,7 +425,31 @@ class Contracts(object):
         Returns:
             A list of tuples containing the shared alphabet and their initial values
         """
-        return self.alphabet
+        return self.index.items()
+
+    @property
+    def alphabet(self):
+        """The shared contract alphabet, as returned by get_alphabet"""
+        return self.index.items()
+
+    def get_users(self, variable):
+        """Get the contracts declaring a variable
+
+        Args:
+            variable: a string variable name
+
+        Returns:
+            A list of contract objects
+        """
+        return [self.contracts[name] for name in self.index.contracts_using(variable) if name in self.contracts]
+
+    def get_conflicts(self):
+        """Get the variables declared with incompatible types by different contracts
+
+        Returns:
+            A list of Conflict tuples
+        """
+        return self.index.conflicts
 
     def __str__(self):
         """Override the print behavior"""
@@ -1,14 +1,66 @@
 """Core module defines the core workflow functions of the LTL contract checker tool"""
 
-import subprocess, re
+import subprocess, re, threading
+from collections import OrderedDict, namedtuple
 from LTL_contracts.src.cgt import Cgt
 from LTL_contracts.src.contract import Contract, Contracts
 from LTL_contracts.src.check import Compatibility, Consistency, Refinement, Checks, Satisfiability, Inclusion
+from LTL_contracts.src.check import verdict_result
+from LTL_contracts.src import propositional, bmc, backends, ordering, memfile, rewrite, intervals
+from LTL_contracts.src.session import SessionPool
+from LTL_contracts.src.cache import VerdictCache, DEFAULT_CACHE_FILE, DEFAULT_MAX_ENTRIES
+from LTL_contracts.src.formula import atoms, common_subformulas, Printer, lift
+from LTL_contracts.src.inclusion import InclusionIndex
+from LTL_contracts.src.trace import Trace
 
-smv_file = "checks_smtfile.smv"
+# the models are generated in memory unless a file name is given
+smv_file = memfile.memory_file('checks_smtfile')
+
+# pool of interactive NuSMV sessions used by run, None runs a new NuSMV process for every file
+session_pool = None
+
+# persistent cache of the verdicts used by verify, None always runs NuSMV
+verdict_cache = None
+
+# decide the checks without temporal operators in process with Z3 instead of running NuSMV
+propositional_fast_path = True
+
+# decide the checks over integer ranges with G and F over temporal-free formulas by interval evaluation in process
+interval_fast_path = True
+
+# cut the ranges of the integer variables compared only with constants before writing the models
+tighten_domains = True
+
+# write a static BDD variable order next to each generated model and pass it to NuSMV
+variable_ordering = True
+
+# order file saved by learn_order from a NuSMV run with dynamic reordering, reused by generate when set
+learned_order_file = None
+
+# prefix of the DEFINE macros of the repeated state formulas in the generated models
+DEFINE_PREFIX = '_shared_'
+
+# simplify the LTL specifications of the checks before writing them, and the size Reduction of the last model
+simplify_specs = True
+last_reduction = None
+
+# implications proven by the inclusion checks of the session, None always runs the checks
+inclusion_index = InclusionIndex()
+
+# counterexamples produced by witness, least recently used first
+witness_cache = OrderedDict()
+WITNESS_CACHE_SIZE = 1024
+witness_lock = threading.Lock()
 
 TAB_WIDTH = 4
 
+# verdict of one LTL specification: the position and the check it belongs to, whether the specification holds,
+# the result of the check, the counterexample as a Trace and the NuSMV output line of the specification
+Verdict = namedtuple('Verdict', ['index', 'check', 'holds', 'result', 'counterexample', 'line'])
+
+# variables declared and removed by generate, as variable names
+Pruning = namedtuple('Pruning', ['declared', 'pruned'])
+
 class Incompatible(Exception):
     print("Incompatible Exception")
 
@@ -28,19 +80,43 @@ def check_inclusion(variables, aproposition, bproposition):
     :return: True or Falsee
     """
 
-    checks = Checks()
+    results = check_inclusions(variables, [(aproposition, bproposition)])
 
-    checks.add_check(Inclusion(aproposition, bproposition))
+    print("RESULTS: " + str(results))
 
-    generate(variables, checks, smv_file)
+    return results[0]
 
-    results = run(smv_file, checks)
 
-    print("RESULTS: " + str(results))
+def check_inclusions(variables, propositions):
+    """
+    Check a batch of inclusions over the same variables with a single NuSMV run
+    :param variables: variables shared by all the propositions
+    :param propositions: list of (aproposition, bproposition) pairs
+    :return: list of True or False, one for each pair
+    """
+    if len(propositions) == 0:
+        return []
+
+    # answer the inclusions entailed by the ones proven so far, and check only the others
+    propositions = [(lift(aproposition), lift(bproposition)) for aproposition, bproposition in propositions]
+    results = [None] * len(propositions)
+    if inclusion_index is not None:
+        results = [inclusion_index.lookup(variables, a, b) for a, b in propositions]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if len(pending) == 0:
+        return results
 
-    return results[0]
+    checks = Checks()
 
+    for i in pending:
+        checks.add_check(Inclusion(*propositions[i]))
 
+    for i, result in zip(pending, verify(variables, checks, witnesses=False)):
+        results[i] = result
+        # an undecided inclusion is neither proven nor refuted
+        if inclusion_index is not None and result is not None:
+            inclusion_index.record(variables, propositions[i][0], propositions[i][1], result)
+    return results
 
 
 def check_satisfiability(contract):
@@ -52,9 +128,8 @@ def check_satisfiability(contract):
     checks = Checks()
 
     checks.add_check(Satisfiability([contract]))
-    generate(Contracts([contract]).get_alphabet(), checks, smv_file)
 
-    results = run(smv_file, checks)
+    results = verify(Contracts([contract]).get_alphabet(), checks, stop_on_failure=True, witnesses=False)
 
     if False in results:
         raise Unsatisfiable
@@ -67,31 +142,347 @@ def check_compatibility_consistency(list_contracts):
     :param list_contracts:
     :return: (compatible, consistent)
     """
+    variables = Contracts(list_contracts).get_alphabet()
+
+    # both checks are run together, consistency is only decided if the contracts are compatible
     checks = Checks()
     checks.add_check(Compatibility("composition", list_contracts))
     checks.add_check(Consistency("composition", list_contracts))
 
-    generate(Contracts(list_contracts).get_alphabet(), checks, smv_file)
-    results = run(smv_file, checks)
+    compatible, consistent = verify(variables, checks, stop_on_failure=True, witnesses=False)
 
-    if not results[0]:
+    if compatible is None:
+        # a cached inconsistency stopped the run before compatibility was decided
+        checks = Checks()
+        checks.add_check(Compatibility("composition", list_contracts))
+        compatible = verify(variables, checks, witnesses=False)[0]
+
+    if not compatible:
         print("The contracts are not compatible, fix the assumptions")
         raise Incompatible
-    if not results[1]:
+
+    if not consistent:
         print("The contracts are not consistent")
         raise Inconsistent
-    elif results[0] and results[1]:
-        print("The contracts are compatible and consistent")
 
+    print("The contracts are compatible and consistent")
+
+
+def use_sessions(size=1):
+    """Routes every run through a pool of persistent interactive NuSMV sessions
+
+    Args:
+        size: the maximum number of concurrent NuSMV sessions
+    """
+    global session_pool
+    stop_sessions()
+    session_pool = SessionPool(size)
+
+
+def stop_sessions():
+    """Terminates the session pool, if any, and goes back to one NuSMV process per run"""
+    global session_pool
+    if session_pool is not None:
+        session_pool.close()
+        session_pool = None
+
+
+def use_cache(path=DEFAULT_CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES):
+    """Answers the checks in verify from a persistent verdict cache, running NuSMV only on the cache misses
+
+    Args:
+        path: a string name of the sqlite file holding the cache
+        max_entries: the maximum number of verdicts kept in the cache
+    """
+    global verdict_cache
+    stop_cache()
+    verdict_cache = VerdictCache(path, max_entries)
+
+
+def stop_cache():
+    """Closes the verdict cache, if any, and goes back to running every check"""
+    global verdict_cache
+    if verdict_cache is not None:
+        verdict_cache.close()
+        verdict_cache = None
+
+
+def verify(variables, checks, smvfile=smv_file, cache=True, split=False, stop_on_failure=False, witnesses=True,
+           bound=None):
+    """Generates and runs the checks, skipping the ones whose verdict is already cached
+
+    Args:
+        variables: variables involved in the check
+        checks: a checks object containing all the desired checks on the system
+        smvfile: a string name for the generated NuSMV file
+        cache: a boolean, False bypasses the verdict cache
+        split: a boolean, if True checks that do not share variables are run as separate models
+        stop_on_failure: a boolean, if True NuSMV is stopped as soon as a check fails
+        witnesses: a boolean, if False NuSMV does not build counterexamples, use witness to get one later
+        bound: an integer, if given the Z3 bounded model checker first searches counterexamples up to bound steps and
+            only the checks it cannot refute are run on NuSMV
+
+    Returns:
+        A list of results, in the same format of the list returned by run, checks not decided because of an earlier
+        failure have result None
+    """
+    if split:
+        results = [None] * len(checks.checks)
+        for group_variables, group_checks, indices in partition(variables, checks):
+            group_results = verify(group_variables, group_checks, smvfile, cache, False, stop_on_failure, witnesses,
+                                   bound)
+            for index, result in zip(indices, group_results):
+                results[index] = result
+            if stop_on_failure and False in group_results:
+                break
+        return results
+
+    if not cache or verdict_cache is None:
+        return _decide(variables, checks, smvfile, stop_on_failure, witnesses, bound)
+
+    keys = [verdict_cache.key(variables, check) for check in checks.checks]
+    results = [verdict_cache.get(key) for key in keys]
+
+    if stop_on_failure and False in results:
+        return results
+
+    missing = Checks()
+    for check, result in zip(checks.checks, results):
+        if result is None:
+            missing.add_check(check)
+
+    if missing.checks:
+        fresh = iter(_decide(variables, missing, smvfile, stop_on_failure, witnesses, bound))
+        for i, key in enumerate(keys):
+            if results[i] is None:
+                results[i] = next(fresh)
+                # a check left undecided after a failure is not cached, the ones after it may still be decided
+                if results[i] is not None:
+                    verdict_cache.put(key, results[i])
+
+    return results
+
+
+def _decide(variables, checks, smvfile, stop_on_failure, witnesses, bound=None):
+    """Returns the results of the checks, sending each one to the backend chosen by the router
+
+    The in-process backends run first, the checks they cannot decide go to the default backend of the router. If
+    bound is given, the checks routed to the default backend are first searched for counterexamples up to bound
+    steps. Checks not decided because of an earlier failure have result None.
+    """
+    results = [None] * len(checks.checks)
+
+    groups = OrderedDict()
+    spec_features = []
+    for i, check in enumerate(checks.checks):
+        name = router.route(variables, check)
+        spec_features.append(router.decisions[-1].features)
+        if bound is not None and name == router.default:
+            name = router.record(check, 'bmc', spec_features[i], 'bound ' + str(bound))
+        groups.setdefault(name, []).append(i)
+    groups.setdefault(router.default, [])
+
+    names = sorted(groups, key=lambda name: (name == router.default, backends.get(name).external))
+    for name in names:
+        group = Checks()
+        for i in groups[name]:
+            group.add_check(checks.checks[i])
+        if not group.checks:
+            continue
+        backend = backends.Bounded(bound) if name == 'bmc' and bound is not None else backends.get(name)
+        for i, result in zip(groups[name], backend.decide(variables, group, smvfile, stop_on_failure, witnesses)):
+            results[i] = result
+            if stop_on_failure and result is False:
+                return results
+            if result is None and name != router.default:
+                router.record(checks.checks[i], router.default, spec_features[i], 'fallback from ' + name)
+                groups[router.default].append(i)
+        groups[router.default].sort()
+
+    return results
+
+
+class NuSMV(backends.Backend):
+    """Decides the checks by generating a NuSMV model and running NuSMV, through the session pool if any
+
+    Attributes:
+        command: the executable, None uses the session pool or NuSMV
+    """
+
+    name = 'nusmv'
+    external = True
 
-def generate(variables, checks, smvfile):
+    def __init__(self, command=None):
+        self.command = command
+
+    def decide(self, variables, checks, smvfile, stop_on_failure=False, witnesses=True):
+        generate(variables, checks, smvfile)
+        results = run(smvfile, checks, stop_on_failure, witnesses, self.commandline(smvfile, witnesses))
+        return results + [None] * (len(checks.checks) - len(results))
+
+    def commandline(self, smvfile, witnesses):
+        """Returns the command line checking smvfile, None for the default one"""
+        if self.command is None:
+            return None
+        ordfile = order_file(smvfile)
+        return [self.command] + ([] if witnesses else ['-dcx']) + \
+            (['-i', ordfile] if memfile.exists(ordfile) else []) + [smvfile]
+
+
+class NuXmv(NuSMV):
+    """Decides the checks with the SAT-based engines of nuXmv, IC3 by default or k-liveness
+
+    Attributes:
+        algorithm: a string, 'ic3' or 'klive'
+    """
+
+    name = 'nuxmv'
+
+    def __init__(self, command='nuXmv', algorithm='ic3'):
+        super(NuXmv, self).__init__(command)
+        self.algorithm = algorithm
+
+    def commandline(self, smvfile, witnesses):
+        script = memfile.companion(smvfile, '.cmd')
+        with open(script, 'w') as ofile:
+            ofile.write('set on_failure_script_quits 1\n')
+            ofile.write('set counter_examples ' + ('1' if witnesses else '0') + '\n')
+            if memfile.exists(order_file(smvfile)):
+                ofile.write('set input_order_file ' + order_file(smvfile) + '\n')
+            ofile.write('read_model -i ' + smvfile + '\n')
+            ofile.write('go_msat\n')
+            ofile.write('check_ltlspec_' + self.algorithm + '\n')
+            ofile.write('quit\n')
+        return [self.command, '-source', script]
+
+
+backends.register(NuSMV())
+backends.register(NuXmv())
+
+
+def _fast_path(features):
+    """Routing predicate of the default router, sending the temporal-free checks to Z3 if the fast path is on"""
+    return propositional_fast_path and features.propositional
+
+
+def _interval_fast_path(features):
+    """Routing predicate of the default router, sending the checks over integer ranges to interval evaluation if
+    both fast paths are on"""
+    return propositional_fast_path and interval_fast_path and backends.is_interval(features)
+
+
+# rules of the default router, everything but the checks over integer ranges and the temporal-free ones goes to NuSMV
+DEFAULT_RULES = [('intervals', _interval_fast_path), ('propositional', _fast_path)]
+
+# router of the checks decided by verify
+router = backends.Router(DEFAULT_RULES)
+
+
+def use_router(new_router=None):
+    """Routes the checks decided by verify with new_router, or with the default router if None
+
+    Args:
+        new_router: a backends.Router, for instance backends.automatic_router()
+    """
+    global router
+    router = new_router or backends.Router(DEFAULT_RULES)
+
+
+def witness(variables, check, smvfile=smv_file, bound=None):
+    """Returns the counterexample of a single check, running it again with counterexamples enabled
+
+    Witnesses are cached in memory, so asking again for the witness of the same check does not run NuSMV.
+
+    Args:
+        variables: variables involved in the check
+        check: a check object
+        smvfile: a string name for the generated NuSMV file
+        bound: an integer, if given the Z3 bounded model checker first searches a counterexample up to bound steps
+
+    Returns:
+        A Trace, empty if the LTL specification of the check holds
+    """
+    key = VerdictCache.key(variables, check)
+    with witness_lock:
+        if key in witness_cache:
+            witness_cache.move_to_end(key)
+            return witness_cache[key]
+
+    counterexample = None
+    if bound is not None:
+        try:
+            with propositional.z3_lock:
+                counterexample = bmc.counterexample(variables, check.get_ltl(), bound)
+        except propositional.Unsupported:
+            pass
+
+    if counterexample is None:
+        checks = Checks()
+        checks.add_check(check)
+        generate(variables, checks, smvfile)
+        counterexample = Trace()
+        verdicts = iter_verdicts(smvfile, checks)
+        try:
+            for verdict in verdicts:
+                counterexample = verdict.counterexample
+        finally:
+            verdicts.close()
+
+    with witness_lock:
+        witness_cache[key] = counterexample
+        if len(witness_cache) > WITNESS_CACHE_SIZE:
+            witness_cache.popitem(last=False)
+    return counterexample
+
+
+def generate(variables, checks, smvfile, prune=True, order=None, share=True, simplify=None, tighten=None):
     """Generates a NuSMV file with configured variable declarations and LTL checks
 
     Args:
         variables: variables involved in the check
         checks: a checks object containing all the desired checks on the system
         smvfile: a string name for the generated NuSMV file
+        prune: a boolean, if True only the variables referenced by the checks are declared
+        order: a boolean, if True the variables are declared in a static order computed from the checks, or in the
+            learned order if any, and the order is written to the order file of smvfile, by default
+            variable_ordering
+        share: a boolean, if True the temporal-free subformulas repeated in the checks are written once, as DEFINE
+            macros
+        simplify: a boolean, if True the specifications are simplified by the rewrite module before being written,
+            by default simplify_specs
+        tighten: a boolean, if True the ranges of the integer variables compared only with constants are cut one
+            past the smallest and the largest constant, by default tighten_domains
+
+    Returns:
+        A Pruning tuple with the names of the declared and of the pruned variables
     """
+    global last_reduction
+    specs = [check.get_ltl() for check in checks.checks]
+    if simplify_specs if simplify is None else simplify:
+        specs, last_reduction = rewrite.simplify_all(specs)
+
+    declared = list(variables)
+    if prune:
+        referenced = set()
+        for spec in specs:
+            referenced |= atoms(spec)
+        declared = [(var, type) for (var, type) in variables if var in referenced]
+    if tighten_domains if tighten is None else tighten:
+        declared = intervals.tighten(declared, specs)
+
+    ordfile = order_file(smvfile)
+    if variable_ordering if order is None else order:
+        names = [var for (var, _) in declared]
+        if learned_order_file is not None:
+            names = ordering.learned_order(names, specs, learned_order_file)
+        else:
+            names = ordering.static_order(names, specs)
+        types = dict(declared)
+        declared = [(var, types[var]) for var in names]
+        ordering.write_order(ordfile, names)
+    elif memfile.exists(ordfile):
+        memfile.remove(ordfile)
+
     with open(smvfile, 'w') as ofile:
 
         # write module heading declaration
@@ -99,109 +490,129 @@ def generate(variables, checks, smvfile):
 
         # write variable type declarations
         ofile.write('VAR\n')
-        for (var, type) in variables:
+        for (var, type) in declared:
             ofile.write('\t' + var + ': ' + type + ';\n')
 
+        # write the repeated state formulas as macros, each one after the macros it uses
+        macros = {}
+        if share:
+            for node in common_subformulas(specs, len(DEFINE_PREFIX) + 3):
+                macros[node] = DEFINE_PREFIX + str(len(macros))
+        if macros:
+            ofile.write('DEFINE\n')
+            printer = Printer(macros)
+            for node, name in macros.items():
+                printer.names.pop(node)
+                printer.memo.pop(node)
+                ofile.write('\t' + name + ' := ' + printer.text(node) + ';\n')
+                printer.names[node] = printer.memo[node] = name
+
         # # write variable assignment declarations
         # ofile.write('ASSIGN\n')
         # for (var, init) in contracts.get_alphabet():
         #     ofile.write('\tinit(' + var + ') := ' + init + ';\n')
         ofile.write('\n')
 
-        # write LTL specifications declarations for each check
-        for check in checks.checks:
-            ofile.write(check.get_ltl())
-
+        # write LTL specifications declarations for each check, formulas are serialized only here
+        printer = Printer(macros)
+        for spec in specs:
+            ofile.write('\tLTLSPEC ' + printer.text(spec) + ';\n')
 
+    names = [var for (var, _) in declared]
+    return Pruning(names, [var for (var, _) in variables if var not in names])
 
-def run(smvfile, checks):
-    """runs the set of contracts and checks through NuSMV and parses the results to return to the user"""
 
-    # Initialize an array to hold the results of the checks
-    results = []
+def order_file(smvfile):
+    """Returns the name of the BDD variable order file of smvfile"""
+    return memfile.companion(smvfile, '.ord')
 
-    # create the command and run in terminal
-    output = subprocess.check_output(['NuSMV', smvfile], encoding='UTF-8').splitlines()
 
-    # Get rid of all initial notes, warnings and blank lines
-    output = [x for x in output if not (x[:3] == '***' or x[:7] == 'WARNING' or x == '')]
+def learn_order(variables, checks, smvfile=smv_file, ordfile=None):
+    """Runs NuSMV with dynamic reordering on the checks and saves the final BDD variable order for generate to reuse
 
-    # Iterate through all remaining lines of output, stopping at each "-- specification line to parse it"
-    result_num = -1  # Counter to keep track of what result you're looking at
-    in_result = False  # Flag to track if you're in a counterexample output
-    temp_counterexample = []
-    counterexamples = {}
+    Args:
+        variables: variables involved in the checks
+        checks: a checks object
+        smvfile: a string name for the generated NuSMV file
+        ordfile: a string name for the learned order file, by default next to smvfile
 
-    for line in output:
-        # If this line is going to indicate whether or not a LTL spec is true/false
-        if line[:16] == '-- specification':
-            check_type = checks.checks[result_num].check_type
-            print("\n" + check_type + " check...")
-            print(line)
-            if in_result:
-                in_result = False
-                counterexamples[result_num] = temp_counterexample
-                temp_counterexample = []
-            if 'is false' in line:
-                result_num += 1
-                if check_type == 'refinement':
-                    results.append(False)
-                    print(checks.checks[result_num].get_contracts()[0].get_name() +
-                          " is NOT a refinement of " + checks.checks[result_num].get_contracts()[1].get_name())
-                elif check_type == 'satisfiability':
-                    results.append(True)
-                    print(str([contract.get_name() for contract in
-                               checks.checks[result_num].get_contracts()]) + " are satisfiabiles")
-                elif check_type == 'compatibility':
-                    results.append(True)
-                    print(str([contract.get_name() for contract in
-                               checks.checks[result_num].get_contracts()]) + " are compatible")
-                elif check_type == 'consistency':
-                    results.append(True)
-                    print(str([contract.get_name() for contract in
-                               checks.checks[result_num].get_contracts()]) + " are consistent")
-                elif check_type == 'inclusion':
-                    results.append(False)
-                    print(str(checks.checks[result_num].aprop) + " is NOT included in " +
-                          str(checks.checks[result_num].bprop))
-            elif 'is true' in line:
-                result_num += 1
-                if check_type == 'refinement':
-                    results.append(True)
-                    print(checks.checks[result_num].get_contracts()[0].get_name() +
-                          " is a refinement of " + checks.checks[result_num].get_contracts()[1].get_name())
-                elif check_type == 'satisfiability':
-                    results.append(False)
-                    print(str([contract.get_name() for contract in
-                               checks.checks[result_num].get_contracts()]) + " are NOT satisfiabiles")
-                elif check_type == 'compatibility':
-                    results.append(False)
-                    print(str([contract.get_name() for contract in
-                               checks.checks[result_num].get_contracts()]) + " are NOT compatible")
-                elif check_type == 'consistency':
-                    results.append(False)
-                    print(str([contract.get_name() for contract in
-                               checks.checks[result_num].get_contracts()]) + " are NOT consistent")
-                elif check_type == 'inclusion':
-                    results.append(True)
-                    print(str(checks.checks[result_num].aprop) + " is included in " +
-                          str(checks.checks[result_num].bprop))
-            print("")
+    Returns:
+        The name of the learned order file
+    """
+    global learned_order_file
+    ordfile = ordfile or memfile.companion(smvfile, '.learned.ord')
+    generate(variables, checks, smvfile)
+    script = memfile.companion(smvfile, '.cmd')
+    with open(script, 'w') as ofile:
+        ofile.write('set on_failure_script_quits 1\n')
+        if memfile.exists(order_file(smvfile)):
+            ofile.write('set input_order_file ' + order_file(smvfile) + '\n')
+        ofile.write('read_model -i ' + smvfile + '\n')
+        ofile.write('go\n')
+        ofile.write('dynamic_var_ordering -e sift\n')
+        ofile.write('set counter_examples 0\n')
+        ofile.write('check_ltlspec\n')
+        ofile.write('write_order -o ' + ordfile + '\n')
+        ofile.write('quit\n')
+    subprocess.run(['NuSMV', '-source', script], stdout=subprocess.DEVNULL, check=True)
+    learned_order_file = ordfile
+    return ordfile
+
+
+def partition(variables, checks):
+    """Splits the checks into groups that do not share any variable, each one can be checked as a separate model
 
-        # If you are currently in a counterexample
-        if in_result:
-            temp_counterexample.append(line)
+    Args:
+        variables: variables involved in the check
+        checks: a checks object containing all the desired checks on the system
 
-        # If the next line is going to be the start of a counterexample, set the in_result flag
-        if line == 'Trace Type: Counterexample ':
-            in_result = True
+    Returns:
+        A list of (variables, checks, indices) tuples, where indices are the positions of the checks in the input
+    """
+    groups = []
+    for index, check in enumerate(checks.checks):
+        names = atoms(check.get_ltl())
+        group = (names, [index])
+        for other in [g for g in groups if g[0] & names]:
+            groups.remove(other)
+            group = (group[0] | other[0], sorted(group[1] + other[1]))
+        groups.append(group)
+
+    partitions = []
+    for names, indices in sorted(groups, key=lambda g: g[1][0]):
+        group_checks = Checks()
+        for index in indices:
+            group_checks.add_check(checks.checks[index])
+        partitions.append(([(var, type) for (var, type) in variables if var in names], group_checks, indices))
+    return partitions
+
+
+def run(smvfile, checks, stop_on_failure=False, witnesses=True, command=None):
+    """runs the set of contracts and checks through NuSMV and parses the results to return to the user
+
+    If stop_on_failure is True, NuSMV is stopped at the first check whose result is False and the returned list
+    only contains the results up to that check. If witnesses is False, NuSMV does not build counterexamples. A
+    command line runs another model checker with the same output format instead of NuSMV."""
 
-    if in_result:
-        in_result = False
-        counterexamples[result_num] = temp_counterexample
-        temp_counterexample = []
+    # Initialize an array to hold the results of the checks
+    results = []
+    counterexamples = {}
 
-    for x in range(result_num + 1):
+    verdicts = iter_verdicts(smvfile, checks, witnesses, command)
+    try:
+        for verdict in verdicts:
+            print("\n" + verdict.check.check_type + " check...")
+            print(verdict.line)
+            print(_describe(verdict))
+            print("")
+            results.append(verdict.result)
+            counterexamples[verdict.index] = verdict.counterexample
+            if stop_on_failure and not verdict.result:
+                break
+    finally:
+        verdicts.close()
+
+    for x in range(len(results)):
         print("Result of checking:", checks.checks[x])
         if checks.checks[x].check_type == 'refinement':
             print('The refinement is', results[x])
@@ -211,15 +622,99 @@ def run(smvfile, checks):
             print('The inclusion is', results[x])
         else:
             print('Statement is', results[x])
-            if results[x] == True:
+            if results[x] == True and counterexamples[x]:
                 print('Example:')
-                for y in counterexamples[x]:
-                    print(y)
+                print(counterexamples[x])
                 print('')
 
     return results
 
 
+def iter_verdicts(smvfile, checks, witnesses=True, command=None):
+    """Runs NuSMV on smvfile and yields the verdict of each LTL specification as soon as NuSMV prints it
+
+    Closing the generator before the end stops NuSMV. The counterexample of a verdict keeps filling up while the
+    output is consumed, and it is complete when the next verdict is yielded or the generator ends.
+
+    Args:
+        smvfile: a string name of the NuSMV file to check
+        checks: the checks object the specifications in smvfile were generated from
+        witnesses: a boolean, if False NuSMV does not build counterexamples and they stay empty
+        command: a command line running another model checker instead of NuSMV, None for NuSMV
+
+    Yields:
+        A Verdict for each specification, in order
+    """
+    lines = _stream(smvfile, witnesses, command)
+    index = -1
+    counterexample = None
+    in_counterexample = False
+    try:
+        for line in lines:
+            # Get rid of all initial notes, warnings and blank lines
+            if line[:3] == '***' or line[:7] == 'WARNING' or line == '':
+                continue
+
+            # If this line is going to indicate whether or not a LTL spec is true/false
+            if line[:16] == '-- specification' or line[:20] == '-- LTL specification':
+                index += 1
+                in_counterexample = False
+                counterexample = Trace()
+                holds = 'is true' in line
+                check = checks.checks[index]
+                yield Verdict(index, check, holds, verdict_result(check.check_type, holds), counterexample, line)
+
+            # If you are currently in a counterexample, the values of the macros written by generate are skipped
+            elif in_counterexample:
+                if not line.strip().startswith(DEFINE_PREFIX):
+                    counterexample.append(line)
+
+            # If the next line is going to be the start of a counterexample, set the flag
+            elif line.strip() == 'Trace Type: Counterexample':
+                in_counterexample = True
+    finally:
+        lines.close()
+
+
+def _describe(verdict):
+    """Returns a human readable sentence about the result of a verdict"""
+    check = verdict.check
+    if check.check_type == 'inclusion':
+        return str(check.aprop) + (" is" if verdict.result else " is NOT") + " included in " + str(check.bprop)
+    names = [contract.get_name() for contract in check.get_contracts()]
+    if check.check_type == 'refinement':
+        return names[0] + (" is" if verdict.result else " is NOT") + " a refinement of " + names[1]
+    adjectives = {'satisfiability': 'satisfiabiles', 'compatibility': 'compatible', 'consistency': 'consistent'}
+    return str(names) + (" are " if verdict.result else " are NOT ") + adjectives[check.check_type]
+
+
+def _stream(smvfile, witnesses=True, command=None):
+    """Yields the output lines of NuSMV checking all the LTL specifications in smvfile, as they are printed
+
+    Closing the generator before the end kills NuSMV. If witnesses is False, counterexamples are not generated. If
+    command is given, that command line is run instead.
+    """
+    ordfile = order_file(smvfile) if memfile.exists(order_file(smvfile)) else None
+    if command is None and session_pool is not None:
+        for line in session_pool.check(smvfile, witnesses, ordfile):
+            yield line
+        return
+
+    if command is None:
+        command = ['NuSMV'] + ([] if witnesses else ['-dcx']) + (['-i', ordfile] if ordfile else []) + [smvfile]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, encoding='UTF-8')
+    try:
+        for line in process.stdout:
+            yield line.rstrip('\n')
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
 def _clean_line(line):
     """Returns a comment-free, tab-replaced line with no whitespace and the number of tabs"""
     line = line.split(COMMENT_CHAR, 1)[0]  # remove comments
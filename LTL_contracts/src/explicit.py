@@ -0,0 +1,353 @@
+"""Explicit module decides LTL specifications in process, translating their negation into a generalized Büchi
+automaton and checking it for emptiness
+
+The generated models have no INIT, ASSIGN or TRANS section, so every infinite sequence of assignments of the
+declared variables is a path: a specification holds if and only if the automaton of its negation accepts no word.
+The maximal temporal-free subformulas are the propositions of the automaton, and the letters are bitsets over them,
+so automata only depend on the formula and are cached, while the consistency of the labels with the variable
+domains is decided by Z3 with the encoder of the propositional module."""
+
+import threading
+from collections import OrderedDict
+import z3
+from LTL_contracts.src import formula as ltl
+from LTL_contracts.src.propositional import Encoder, Unsupported
+
+# specifications with more propositions than this are left to NuSMV
+MAX_PROPOSITIONS = 20
+
+# automata translated by automaton, least recently used first
+automaton_cache = OrderedDict()
+AUTOMATON_CACHE_SIZE = 256
+
+# letters built by holds, keyed by the propositions and the variables, least recently used first
+letters_cache = OrderedDict()
+
+# guards the caches, checks are decided concurrently by the scheduler
+_lock = threading.Lock()
+
+# marker of the initial states in the incoming sets of the tableau
+INIT = -1
+
+
+class Automaton(object):
+    """Automaton is a state-labeled generalized Büchi automaton over bitsets of propositions
+
+    Attributes:
+        propositions: a list of the temporal-free formulas, proposition i is bit i of the letters
+        positive: a list with the bitset of the propositions that must hold in each state
+        negative: a list with the bitset of the propositions that must not hold in each state
+        initial: a list of the initial states
+        successors: a list with the list of successors of each state
+        accepting: a list of sets of states, an accepting run visits each of them infinitely often
+    """
+
+    __slots__ = ('propositions', 'positive', 'negative', 'initial', 'successors', 'accepting')
+
+    def __init__(self, propositions):
+        """Initialize an automaton with no states"""
+        self.propositions = propositions
+        self.positive = []
+        self.negative = []
+        self.initial = []
+        self.successors = []
+        self.accepting = []
+
+    def __len__(self):
+        return len(self.positive)
+
+
+def negation_normal_form(formula):
+    """Returns the negation normal form of formula and the list of its propositions
+
+    Negations are pushed down to the propositions, G and F are rewritten with V and U, and every maximal
+    temporal-free subformula becomes a proposition.
+
+    Raises:
+        Unsupported: if formula contains past operators, opaque text or more than MAX_PROPOSITIONS propositions
+    """
+    positive, negative, temporal_free = {}, {}, {}
+    propositions = []
+    for node in ltl.postorder(formula):
+        op = node.op
+        if op == 'raw':
+            raise Unsupported('opaque formula ' + node.args[0])
+        temporal_free[node] = op not in ltl.TEMPORAL_UNARY + ltl.TEMPORAL_BINARY and \
+            all(temporal_free[child] for child in node.children())
+        if node in (ltl.TRUE, ltl.FALSE):
+            positive[node], negative[node] = node, ltl.FALSE if node == ltl.TRUE else ltl.TRUE
+            continue
+        if temporal_free[node]:
+            if op == '!':
+                positive[node], negative[node] = negative[node.args[0]], positive[node.args[0]]
+            else:
+                positive[node], negative[node] = node, ltl.Not(node)
+            continue
+        # the propositions are the temporal-free operands of the other nodes, stripped of their negations
+        for child in node.children():
+            if temporal_free[child]:
+                _add_proposition(propositions, positive[child])
+        args = node.children()
+        pos, neg = [positive[a] for a in args], [negative[a] for a in args]
+        if op == '!':
+            positive[node], negative[node] = neg[0], pos[0]
+        elif op == '&':
+            positive[node], negative[node] = ltl.And(*pos), ltl.Or(*neg)
+        elif op == '|':
+            positive[node], negative[node] = ltl.Or(*pos), ltl.And(*neg)
+        elif op == '->':
+            positive[node], negative[node] = ltl.Or(neg[0], pos[1]), ltl.And(pos[0], neg[1])
+        elif op in ('<->', 'xnor', 'xor'):
+            same = ltl.Or(ltl.And(pos[0], pos[1]), ltl.And(neg[0], neg[1]))
+            different = ltl.Or(ltl.And(pos[0], neg[1]), ltl.And(neg[0], pos[1]))
+            positive[node], negative[node] = (different, same) if op == 'xor' else (same, different)
+        elif op == 'X':
+            positive[node], negative[node] = ltl.Next(pos[0]), ltl.Next(neg[0])
+        elif op == 'G':
+            positive[node], negative[node] = ltl.Formula('V', ltl.FALSE, pos[0]), ltl.Until(ltl.TRUE, neg[0])
+        elif op == 'F':
+            positive[node], negative[node] = ltl.Until(ltl.TRUE, pos[0]), ltl.Formula('V', ltl.FALSE, neg[0])
+        elif op == 'U':
+            positive[node], negative[node] = ltl.Until(pos[0], pos[1]), ltl.Formula('V', neg[0], neg[1])
+        elif op == 'V':
+            positive[node], negative[node] = ltl.Formula('V', pos[0], pos[1]), ltl.Until(neg[0], neg[1])
+        else:
+            raise Unsupported('operator ' + op)
+    if temporal_free[formula]:
+        _add_proposition(propositions, positive[formula])
+    if len(propositions) > MAX_PROPOSITIONS:
+        raise Unsupported(str(len(propositions)) + ' propositions')
+    return positive[formula], propositions
+
+
+def _add_proposition(propositions, literal):
+    """Appends the proposition of a literal of the negation normal form to propositions, if it is not there yet"""
+    if literal not in (ltl.TRUE, ltl.FALSE):
+        proposition = literal.args[0] if literal.op == '!' else literal
+        if proposition not in propositions:
+            propositions.append(proposition)
+
+
+def automaton(formula):
+    """Returns the automaton accepting the words satisfying formula, translating it only the first time
+
+    The translation is the tableau construction of Gerth, Peled, Vardi and Wolper, run with an explicit stack.
+
+    Args:
+        formula: a formula object
+
+    Returns:
+        An Automaton
+
+    Raises:
+        Unsupported: if formula is outside the supported fragment
+    """
+    with _lock:
+        if formula in automaton_cache:
+            automaton_cache.move_to_end(formula)
+            return automaton_cache[formula]
+
+    normal, propositions = negation_normal_form(formula)
+    bits = dict((proposition, 1 << i) for i, proposition in enumerate(propositions))
+    literals = set(propositions) | set(ltl.Not(proposition) for proposition in propositions)
+
+    # tableau nodes are [incoming, new, old, next] lists of sets, completed nodes are indexed by (old, next)
+    states = OrderedDict()
+    incoming = []
+    stack = [[{INIT}, {normal}, set(), set()]]
+    while stack:
+        node = stack.pop()
+        node_incoming, new, old, next = node
+        if not new:
+            key = (frozenset(old), frozenset(next))
+            if key in states:
+                incoming[states[key]] |= node_incoming
+            else:
+                states[key] = len(incoming)
+                incoming.append(set(node_incoming))
+                stack.append([{states[key]}, set(next), set(), set()])
+            continue
+        eta = new.pop()
+        if eta in old:
+            stack.append(node)
+            continue
+        op = eta.op
+        if eta in literals or eta in (ltl.TRUE, ltl.FALSE):
+            if eta != ltl.FALSE and _complement(eta) not in old:
+                old.add(eta)
+                stack.append(node)
+        elif op in ('U', 'V', '|'):
+            if op == 'U':
+                branches = [({eta.args[0]}, {eta}), ({eta.args[1]}, set())]
+            elif op == 'V':
+                branches = [({eta.args[1]}, {eta}), ({eta.args[0], eta.args[1]}, set())]
+            else:
+                branches = [({operand}, set()) for operand in eta.args]
+            for extra_new, extra_next in branches:
+                stack.append([set(node_incoming), new | (extra_new - old - {eta}), old | {eta}, next | extra_next])
+        elif op == '&':
+            stack.append([node_incoming, new | (set(eta.args) - old), old | {eta}, next])
+        else:
+            stack.append([node_incoming, new, old | {eta}, next | {eta.args[0]}])
+
+    result = Automaton(propositions)
+    untils = set(node for (old, _) in states for node in old if node.op == 'U')
+    for (old, _), state in states.items():
+        result.positive.append(sum(bits[node] for node in old if node in bits))
+        result.negative.append(sum(bits[node.args[0]] for node in old if node.op == '!'))
+        result.successors.append([])
+        if INIT in incoming[state]:
+            result.initial.append(state)
+    for state, sources in enumerate(incoming):
+        for source in sources:
+            if source != INIT:
+                result.successors[source].append(state)
+    for until in untils:
+        result.accepting.append(set(state for (old, _), state in states.items()
+                                    if until not in old or until.args[1] in old))
+
+    with _lock:
+        automaton_cache[formula] = result
+        if len(automaton_cache) > AUTOMATON_CACHE_SIZE:
+            automaton_cache.popitem(last=False)
+    return result
+
+
+def _complement(literal):
+    """Returns the negation of a literal of the negation normal form"""
+    if literal == ltl.TRUE:
+        return ltl.FALSE
+    return literal.args[0] if literal.op == '!' else ltl.Not(literal)
+
+
+class Letters(object):
+    """Letters decides which labels of an automaton are consistent with the variable domains
+
+    Attributes:
+        variables: variables involved in the propositions
+        propositions: a list of the temporal-free formulas the labels refer to
+        encoded: a list of the Z3 encodings of the propositions
+        atomic: a bitset of the propositions that are boolean variables, labels over them only are always consistent
+        consistent: a dictionary mapping each (positive, negative) label already decided to its consistency
+    """
+
+    def __init__(self, variables, propositions):
+        """Initialize the letters, encoding the propositions in Z3"""
+        self.variables = variables
+        self.propositions = propositions
+        self.encoder = Encoder(variables)
+        self.encoded = [self.encoder.encode(proposition) for proposition in propositions]
+        booleans = set(var for (var, type) in variables if type.strip() == 'boolean')
+        self.atomic = sum(1 << i for i, proposition in enumerate(propositions)
+                          if proposition.op == 'atom' and proposition.args[0] in booleans)
+        self.consistent = {}
+
+    def is_consistent(self, positive, negative):
+        """Returns True if some assignment of the variables satisfies the label"""
+        if positive & negative:
+            return False
+        if (positive | negative) & ~self.atomic == 0:
+            return True
+        label = (positive, negative)
+        if label not in self.consistent:
+            literals = []
+            for i, encoded in enumerate(self.encoded):
+                if positive >> i & 1:
+                    literals.append(encoded)
+                elif negative >> i & 1:
+                    literals.append(z3.Not(encoded))
+            solver = z3.Solver()
+            solver.add(self.encoder.domain())
+            solver.add(literals)
+            self.consistent[label] = solver.check() == z3.sat
+        return self.consistent[label]
+
+
+def is_empty(automaton, letters):
+    """Returns True if the automaton accepts no infinite sequence of consistent letters
+
+    The reachable part of the automaton restricted to the consistent states is explored with an iterative Tarjan
+    search, and the automaton is not empty as soon as a closed strongly connected component meets every accepting
+    set.
+    """
+    alive = [letters.is_consistent(automaton.positive[s], automaton.negative[s]) for s in range(len(automaton))]
+    index, lowlink, on_stack = {}, {}, set()
+    component_stack = []
+    for root in automaton.initial:
+        if not alive[root] or root in index:
+            continue
+        work = [(root, iter(automaton.successors[root]))]
+        index[root] = lowlink[root] = len(index)
+        component_stack.append(root)
+        on_stack.add(root)
+        while work:
+            state, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if not alive[successor]:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    component_stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(automaton.successors[successor])))
+                    advanced = True
+                    break
+                if successor in on_stack:
+                    lowlink[state] = min(lowlink[state], index[successor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[state])
+            if lowlink[state] == index[state]:
+                component = set()
+                while True:
+                    member = component_stack.pop()
+                    on_stack.discard(member)
+                    component.add(member)
+                    if member == state:
+                        break
+                if _is_accepting(automaton, component, alive):
+                    return False
+    return True
+
+
+def _is_accepting(automaton, component, alive):
+    """Returns True if component contains a cycle and meets every accepting set"""
+    if len(component) == 1:
+        state = next(iter(component))
+        if state not in automaton.successors[state]:
+            return False
+    return all(component & accepting for accepting in automaton.accepting)
+
+
+def holds(variables, formula):
+    """Decides whether an LTL specification holds on every path of the unconstrained model of the variables
+
+    Args:
+        variables: variables involved in the specification
+        formula: a formula object
+
+    Returns:
+        True if no path satisfies the negation of formula
+
+    Raises:
+        Unsupported: if formula or a variable type is outside the supported fragment
+    """
+    negated = automaton(ltl.Not(formula))
+    key = (tuple(negated.propositions), tuple(sorted(set(variables))))
+    with _lock:
+        letters = letters_cache.get(key)
+        if letters is not None:
+            letters_cache.move_to_end(key)
+    if letters is None:
+        try:
+            letters = Letters(variables, negated.propositions)
+        except z3.Z3Exception as error:
+            raise Unsupported('ill-typed formula ' + str(formula) + ': ' + str(error))
+        with _lock:
+            letters_cache[key] = letters
+            if len(letters_cache) > AUTOMATON_CACHE_SIZE:
+                letters_cache.popitem(last=False)
+    return is_empty(negated, letters)
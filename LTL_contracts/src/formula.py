@@ -0,0 +1,443 @@
+"""Formula module defines an immutable, hash-consed representation of the LTL formulas of the contracts and its
+serialization to NuSMV syntax
+
+Structurally equal formulas are always the same object, so contracts built from each other share their subformulas
+instead of copying strings, and equality and hashing are O(1)."""
+
+import re, weakref
+from functools import lru_cache
+
+# operator precedences, from the loosest to the tightest binding
+PRECEDENCE = {
+    '->': 1, '<->': 2, '|': 3, 'xor': 3, 'xnor': 3, '&': 4,
+    'U': 5, 'V': 5, 'S': 5, 'T': 5,
+    '!': 6, 'X': 6, 'G': 6, 'F': 6, 'Y': 6, 'Z': 6, 'H': 6, 'O': 6,
+    '=': 7, '!=': 7, '<': 7, '<=': 7, '>': 7, '>=': 7, 'in': 7,
+    '+': 8, '-': 8, '*': 9, '/': 9, 'mod': 9, 'neg': 10,
+}
+LEAF_PRECEDENCE = 11
+
+LEAVES = ('atom', 'const', 'int', 'raw')
+TEMPORAL_UNARY = ('X', 'G', 'F', 'Y', 'Z', 'H', 'O')
+TEMPORAL_BINARY = ('U', 'V', 'S', 'T')
+NARY = ('&', '|')
+RIGHT_ASSOCIATIVE = ('->',)
+
+
+class ParseError(Exception):
+    """Raised when a string is not a formula of the supported NuSMV LTL fragment"""
+    pass
+
+
+class Formula(object):
+    """Formula is a node of a hash-consed LTL formula DAG
+
+    Attributes:
+        op: a string operator, or the kind of leaf ('atom', 'const', 'int', 'raw')
+        args: a tuple of children formulas, or the value of a leaf
+        hash: the precomputed hash of the node
+    """
+
+    __slots__ = ('op', 'args', 'hash', '__weakref__')
+
+    _table = weakref.WeakValueDictionary()
+
+    def __new__(cls, op, *args):
+        """Returns the unique node with the given operator and arguments, creating it if needed"""
+        key = (op, args)
+        node = cls._table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            object.__setattr__(node, 'op', op)
+            object.__setattr__(node, 'args', args)
+            object.__setattr__(node, 'hash', hash(key))
+            node = cls._table.setdefault(key, node)
+        return node
+
+    def __setattr__(self, name, value):
+        """Formulas are immutable"""
+        raise AttributeError('Formula objects are immutable')
+
+    def __hash__(self):
+        return self.hash
+
+    def __reduce__(self):
+        """Unpickled formulas are interned again"""
+        return Formula, (self.op,) + self.args
+
+    def is_leaf(self):
+        """Returns True if the formula has no subformulas"""
+        return self.op in LEAVES
+
+    def children(self):
+        """Returns the tuple of direct subformulas"""
+        return () if self.op in LEAVES else self.args
+
+    def __str__(self):
+        """Override the print behavior"""
+        return to_smv(self)
+
+    def __repr__(self):
+        return 'Formula(' + to_smv(self) + ')'
+
+
+def Atom(name):
+    """Returns the atomic proposition or variable name"""
+    return Formula('atom', name)
+
+
+def Int(value):
+    """Returns the integer constant value"""
+    return Formula('int', int(value))
+
+
+TRUE = Formula('const', 'TRUE')
+FALSE = Formula('const', 'FALSE')
+
+
+def Not(formula):
+    """Returns the negation of formula"""
+    return Formula('!', formula)
+
+
+def And(*formulas):
+    """Returns the conjunction of formulas, TRUE if there are none"""
+    if len(formulas) == 0:
+        return TRUE
+    if len(formulas) == 1:
+        return formulas[0]
+    return Formula('&', *formulas)
+
+
+def Or(*formulas):
+    """Returns the disjunction of formulas, FALSE if there are none"""
+    if len(formulas) == 0:
+        return FALSE
+    if len(formulas) == 1:
+        return formulas[0]
+    return Formula('|', *formulas)
+
+
+def Implies(aformula, bformula):
+    """Returns the implication of bformula by aformula"""
+    return Formula('->', aformula, bformula)
+
+
+def Globally(formula):
+    """Returns G formula"""
+    return Formula('G', formula)
+
+
+def Eventually(formula):
+    """Returns F formula"""
+    return Formula('F', formula)
+
+
+def Next(formula):
+    """Returns X formula"""
+    return Formula('X', formula)
+
+
+def Until(aformula, bformula):
+    """Returns aformula U bformula"""
+    return Formula('U', aformula, bformula)
+
+
+def Compare(op, aformula, bformula):
+    """Returns the comparison of two terms, op is one of =, !=, <, <=, >, >="""
+    return Formula(op, aformula, bformula)
+
+
+def lift(value):
+    """Returns value as a formula, parsing it if it is a string
+
+    Strings outside of the supported fragment become opaque leaves that are emitted verbatim.
+    """
+    if isinstance(value, Formula):
+        return value
+    if isinstance(value, str):
+        try:
+            return parse(value)
+        except ParseError:
+            return Formula('raw', value.strip())
+    raise TypeError('cannot build a formula from ' + repr(value))
+
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_$#.]*')
+
+
+def atoms(formula):
+    """Returns the names referenced by formula
+
+    Opaque leaves contribute every identifier in their text, so the result is always a superset of the variables
+    the formula depends on.
+    """
+    names = set()
+    for node in postorder(formula):
+        if node.op == 'atom':
+            names.add(node.args[0])
+        elif node.op == 'raw':
+            names.update(_IDENTIFIER.findall(node.args[0]))
+    return names
+
+
+def depth(formula):
+    """Returns the nesting depth of formula, leaves have depth 0"""
+    depths = {}
+    for node in postorder(formula):
+        depths[node] = 1 + max([depths[child] for child in node.children()]) if node.children() else 0
+    return depths[formula]
+
+
+def size(formula):
+    """Returns the number of distinct nodes of formula"""
+    return len(postorder(formula))
+
+
+def postorder(formula):
+    """Returns the list of the distinct nodes of formula, each one after all its children"""
+    order, visited, stack = [], set(), [(formula, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+        elif node not in visited:
+            visited.add(node)
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children())
+    return order
+
+
+def to_smv(formula, names=None):
+    """Serializes formula to NuSMV syntax
+
+    Args:
+        formula: a formula object
+        names: a dictionary mapping subformulas to the names printed in their place, such as DEFINE macros
+
+    Returns:
+        A string NuSMV expression, shared subformulas are serialized only once
+    """
+    return Printer(names).text(formula)
+
+
+def common_subformulas(formulas, name_length=1):
+    """Returns the temporal-free subformulas worth a DEFINE macro when serializing formulas
+
+    A subformula is worth a macro if writing its text once in the DEFINE section and a name of name_length
+    characters at each occurrence is shorter than writing its text at each occurrence. Occurrences are counted
+    after replacing the returned subformulas that contain it.
+
+    Args:
+        formulas: a list of formula objects
+        name_length: the length of the names of the macros
+
+    Returns:
+        A list of formula objects, each one after the ones it contains
+    """
+    order, seen = [], set()
+    for formula in formulas:
+        for node in postorder(formula):
+            if node not in seen:
+                seen.add(node)
+                order.append(node)
+    temporal_free = {}
+    for node in order:
+        temporal_free[node] = node.op not in TEMPORAL_UNARY + TEMPORAL_BINARY + ('raw',) and \
+            all(temporal_free[child] for child in node.children())
+
+    occurrences = dict((node, 0) for node in order)
+    for formula in formulas:
+        occurrences[formula] += 1
+    printer = Printer()
+    common = set()
+    for node in reversed(order):
+        if temporal_free[node] and node.op not in LEAVES + ('set',) and occurrences[node] > 1:
+            length = len(printer.text(node))
+            if occurrences[node] * length > length + len('\t := ;\n') + (occurrences[node] + 1) * name_length:
+                common.add(node)
+        for child in node.children():
+            occurrences[child] += 1 if node in common else occurrences[node]
+    return [node for node in order if node in common]
+
+
+class Printer(object):
+    """Precedence-aware NuSMV printer memoizing the text of the shared nodes
+
+    Attributes:
+        names: a dictionary mapping subformulas to the names printed in their place
+        memo: a dictionary mapping the nodes printed so far to their text
+    """
+
+    def __init__(self, names=None):
+        self.names = dict(names or {})
+        self.memo = dict(self.names)
+
+    def text(self, node):
+        """Returns the text of node, without enclosing parentheses"""
+        text = self.memo.get(node)
+        if text is None:
+            for descendant in postorder(node):
+                if descendant not in self.memo:
+                    self.memo[descendant] = self._text(descendant)
+            text = self.memo[node]
+        return text
+
+    def _text(self, node):
+        op = node.op
+        if op in LEAVES:
+            if op == 'raw':
+                return '(' + node.args[0] + ')'
+            return str(node.args[0])
+        if op == 'set':
+            return '{' + ', '.join(self.text(x) for x in node.args) + '}'
+        if op == 'neg':
+            return '-' + self._wrap(node.args[0], lambda child: child.op in LEAVES)
+        if op in TEMPORAL_UNARY:
+            return op + '(' + self.text(node.args[0]) + ')'
+        if op == '!':
+            return '!' + self._wrap(node.args[0], _is_unary)
+        if op in TEMPORAL_BINARY:
+            return (' ' + op + ' ').join(self._wrap(child, _is_unary) for child in node.args)
+        precedence = PRECEDENCE[op]
+        operands = []
+        for i, child in enumerate(node.args):
+            operands.append(self._wrap(child, lambda c: self._bare(c, precedence, op, i, len(node.args))))
+        return (' ' + op + ' ').join(operands)
+
+    @staticmethod
+    def _bare(child, precedence, op, position, arity):
+        """Returns True if child can be printed without parentheses as operand of op"""
+        if child.op in TEMPORAL_BINARY or (child.op == '&' and precedence == PRECEDENCE['|']):
+            return False
+        child_precedence = LEAF_PRECEDENCE if child.op in LEAVES or child.op == 'set' else PRECEDENCE[child.op]
+        if child_precedence != precedence:
+            return child_precedence > precedence
+        if op in NARY:
+            return child.op == op
+        if op in RIGHT_ASSOCIATIVE:
+            return position == arity - 1
+        if precedence in (8, 9):
+            return position == 0
+        return False
+
+    def _wrap(self, child, bare):
+        """Returns the text of child, parenthesized unless bare(child)"""
+        text = self.text(child)
+        return text if child in self.names or bare(child) else '(' + text + ')'
+
+
+def _is_unary(node):
+    """Returns True if node is a leaf or a unary operator, which never need parentheses as operands"""
+    return node.op in LEAVES or node.op in TEMPORAL_UNARY or node.op == '!'
+
+
+_TOKEN = re.compile(r'\s*(?:(\d+)|([A-Za-z_][A-Za-z0-9_$#.]*)|(<->|->|!=|<=|>=|[!&|()=<>+\-*/{},]))')
+_KEYWORD_OPERATORS = ('xor', 'xnor', 'mod', 'in', 'U', 'V', 'S', 'T')
+
+
+def _tokenize(text):
+    """Splits text into a list of tokens"""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ParseError('unexpected character at ' + str(position) + ' in: ' + text)
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(('int', int(number)))
+        elif name is not None:
+            tokens.append(('op', name) if name in _KEYWORD_OPERATORS + TEMPORAL_UNARY else ('name', name))
+        else:
+            tokens.append(('op', symbol))
+        position = match.end()
+    return tokens
+
+
+@lru_cache(maxsize=8192)
+def parse(text):
+    """Parses a NuSMV LTL expression
+
+    Args:
+        text: a string LTL expression
+
+    Returns:
+        A formula object
+
+    Raises:
+        ParseError: if text is not in the supported fragment
+    """
+    parser = _Parser(_tokenize(text))
+    formula = parser.expression(0)
+    if parser.position != len(parser.tokens):
+        raise ParseError('unexpected ' + str(parser.tokens[parser.position][1]) + ' in: ' + text)
+    return formula
+
+
+class _Parser(object):
+    """Precedence climbing parser over a list of tokens"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def advance(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ParseError('unexpected end of formula')
+        self.position += 1
+        return token
+
+    def expect(self, symbol):
+        if self.advance() != ('op', symbol):
+            raise ParseError('expected ' + symbol)
+
+    def expression(self, min_precedence):
+        left = self.prefix()
+        while True:
+            kind, op = self.peek()
+            if kind != 'op' or op not in PRECEDENCE or op in TEMPORAL_UNARY or op == '!':
+                return left
+            precedence = PRECEDENCE[op]
+            if precedence < min_precedence:
+                return left
+            self.advance()
+            right = self.expression(precedence if op in RIGHT_ASSOCIATIVE else precedence + 1)
+            if op in NARY:
+                operands = (left.args if left.op == op else (left,)) + (right.args if right.op == op else (right,))
+                left = Formula(op, *operands)
+            else:
+                left = Formula(op, left, right)
+
+    def prefix(self):
+        kind, value = self.advance()
+        if kind == 'int':
+            return Int(value)
+        if kind == 'name':
+            if value in ('TRUE', 'FALSE'):
+                return Formula('const', value)
+            return Atom(value)
+        if value == '(':
+            formula = self.expression(0)
+            self.expect(')')
+            return formula
+        if value == '{':
+            elements = [self.expression(LEAF_PRECEDENCE)]
+            while self.peek() == ('op', ','):
+                self.advance()
+                elements.append(self.expression(LEAF_PRECEDENCE))
+            self.expect('}')
+            return Formula('set', *elements)
+        if value == '!' or value in TEMPORAL_UNARY:
+            return Formula(value, self.expression(PRECEDENCE[value]))
+        if value == '-':
+            operand = self.expression(PRECEDENCE['neg'])
+            if operand.op == 'int':
+                return Int(-operand.args[0])
+            return Formula('neg', operand)
+        raise ParseError('unexpected ' + str(value))
@@ -0,0 +1,115 @@
+"""Inclusion module keeps the implications between propositions proven so far, and derives from them the answers of
+new inclusion queries without running a model checker
+
+Inclusion between LTL propositions is a preorder, so the proven implications are the edges of a graph and an
+implication holds if its conclusion is reachable from its premise. A proposition also implies each of its conjuncts
+and is implied by each of its disjuncts. A refuted implication x -> y refutes every a -> b with x -> a and b -> y.
+
+Whether an implication holds depends on the domains of the variables it references, so each fact is recorded with
+the declarations of its variables, its signature, and is only used for queries that declare them with the same
+types."""
+
+from collections import deque
+from LTL_contracts.src import formula as ltl
+
+
+class InclusionIndex(object):
+    """InclusionIndex records proven implications and non-implications and answers the queries they entail
+
+    Attributes:
+        successors: a dictionary mapping each premise to a dictionary from its proven conclusions to the signatures
+            of the facts
+        predecessors: a dictionary mapping each conclusion to a dictionary from its proven premises to the
+            signatures of the facts
+        refuted: a dictionary mapping each premise to a dictionary from the conclusions it does not imply to the
+            signatures of the facts
+        derived: the number of queries answered without a model checker
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.successors = {}
+        self.predecessors = {}
+        self.refuted = {}
+        self.derived = 0
+
+    def record(self, variables, aproposition, bproposition, holds):
+        """Records whether aproposition implies bproposition
+
+        Args:
+            variables: variables involved in the propositions
+            aproposition: a formula premise
+            bproposition: a formula conclusion
+            holds: a boolean, the result of the inclusion check
+        """
+        signature = _signature(variables, aproposition, bproposition)
+        if holds:
+            self.successors.setdefault(aproposition, {})[bproposition] = signature
+            self.predecessors.setdefault(bproposition, {})[aproposition] = signature
+        else:
+            self.refuted.setdefault(aproposition, {})[bproposition] = signature
+
+    def lookup(self, variables, aproposition, bproposition):
+        """Returns whether aproposition implies bproposition if it follows from the facts recorded so far
+
+        Args:
+            variables: variables involved in the propositions
+            aproposition: a formula premise
+            bproposition: a formula conclusion
+
+        Returns:
+            True or False if the answer is entailed, None otherwise
+        """
+        declarations = set(variables)
+        implied = self._reachable(self.successors, declarations, aproposition, _conjuncts)
+        if any(subsumes(proposition, bproposition) for proposition in implied):
+            self.derived += 1
+            return True
+        premises = self._reachable(self.predecessors, declarations, aproposition, _disjuncts)
+        conclusions = self._reachable(self.successors, declarations, bproposition, _conjuncts)
+        for premise in premises:
+            for conclusion, signature in self.refuted.get(premise, {}).items():
+                if conclusion in conclusions and signature <= declarations:
+                    self.derived += 1
+                    return False
+        return None
+
+    def _reachable(self, edges, declarations, start, parts):
+        """Returns the propositions reachable from start through the edges usable with declarations and through the
+        syntactic parts of each proposition"""
+        reached, queue = {start}, deque([start])
+        while queue:
+            proposition = queue.popleft()
+            neighbors = [other for other, signature in edges.get(proposition, {}).items()
+                         if signature <= declarations]
+            for other in neighbors + parts(proposition):
+                if other not in reached:
+                    reached.add(other)
+                    queue.append(other)
+        return reached
+
+
+def subsumes(aproposition, bproposition):
+    """Returns True if aproposition syntactically implies bproposition: they are the same, or the conjuncts of
+    bproposition are among the ones of aproposition, or the disjuncts of aproposition among the ones of bproposition"""
+    if aproposition == bproposition or aproposition == ltl.FALSE or bproposition == ltl.TRUE:
+        return True
+    if set(_conjuncts(bproposition) or [bproposition]) <= set(_conjuncts(aproposition) or [aproposition]):
+        return True
+    return set(_disjuncts(aproposition) or [aproposition]) <= set(_disjuncts(bproposition) or [bproposition])
+
+
+def _conjuncts(proposition):
+    """Returns the list of the conjuncts of a conjunction, empty for other formulas"""
+    return list(proposition.args) if proposition.op == '&' else []
+
+
+def _disjuncts(proposition):
+    """Returns the list of the disjuncts of a disjunction, empty for other formulas"""
+    return list(proposition.args) if proposition.op == '|' else []
+
+
+def _signature(variables, aproposition, bproposition):
+    """Returns the frozen set of the declarations of the variables referenced by the propositions"""
+    names = ltl.atoms(aproposition) | ltl.atoms(bproposition)
+    return frozenset((var, type) for (var, type) in variables if var in names)
@@ -0,0 +1,228 @@
+"""Intervals module decides in process the specifications over ranged integers and booleans whose temporal operators
+are G and F applied to temporal-free formulas, and tightens the integer ranges of the generated models
+
+A temporal-free formula is evaluated on every state of its variables at once, as a numpy mask over their product.
+Since the generated models have no INIT, ASSIGN or TRANS section, any nonempty set S of states containing the first
+one is the set of states of some path: G p holds on it if S is within the mask of p and F p if S meets it. The
+specification fails if for some truth values of its G and F subformulas there is a set S giving them those values
+and a first state in S falsifying the rest of the formula.
+
+A variable compared only with constants takes the same truth values below its smallest constant and above its
+largest one, so its range can be cut one past them without changing any verdict."""
+
+import functools, itertools
+from LTL_contracts.src import formula as ltl
+from LTL_contracts.src.propositional import Unsupported, RANGE
+
+# largest product of the domains of the variables of a specification evaluated in process
+MAX_STATES = 1 << 20
+
+# largest number of distinct G and F subformulas of a specification evaluated in process
+MAX_TEMPORAL = 10
+
+COMPARISONS = ('=', '!=', '<', '<=', '>', '>=')
+ARITHMETIC = {'+': lambda a, b: a + b, '-': lambda a, b: a - b, '*': lambda a, b: a * b}
+
+
+class States(object):
+    """States holds the values of the variables of a specification on every state of their product
+
+    Attributes:
+        names: a list of the variable names, one axis of the product each
+        shape: the shape of the product
+        values: a dictionary mapping each name to the array of its values, broadcastable to shape
+    """
+
+    def __init__(self, variables, names):
+        """Initialize the states of the variables called names
+
+        Raises:
+            Unsupported: if a variable is not boolean or ranged, or the product is larger than MAX_STATES
+        """
+        import numpy
+        types = dict(variables)
+        self.names = sorted(names)
+        axes = []
+        for name in self.names:
+            type = types[name].strip()
+            match = RANGE.match(type)
+            if type == 'boolean':
+                axes.append(numpy.array([False, True]))
+            elif match:
+                axes.append(numpy.arange(int(match.group(1)), int(match.group(2)) + 1, dtype=numpy.int64))
+            else:
+                raise Unsupported('type ' + type + ' of ' + name)
+        self.shape = tuple(len(axis) for axis in axes)
+        if numpy.prod(self.shape, dtype=float) > MAX_STATES or 0 in self.shape:
+            raise Unsupported(str(self.shape) + ' states')
+        grid = numpy.meshgrid(*axes, indexing='ij', sparse=True) if axes else []
+        self.values = dict(zip(self.names, grid))
+
+    def mask(self, value):
+        """Returns a boolean value of the states as a flat array over the whole product"""
+        import numpy
+        return numpy.broadcast_to(value, self.shape).ravel()
+
+
+def evaluate(states, formula, temporal):
+    """Evaluates a formula on every state
+
+    Args:
+        states: a States object over the variables of formula
+        formula: a formula object
+        temporal: a dictionary mapping the G and F subformulas to their boolean truth value
+
+    Returns:
+        A boolean or integer array broadcastable to states.shape
+
+    Raises:
+        Unsupported: if formula is outside the fragment
+    """
+    import numpy
+    values = {}
+    for node in ltl.postorder(formula):
+        if node in values:
+            continue
+        op = node.op
+        if node in temporal:
+            values[node] = numpy.bool_(temporal[node])
+            continue
+        if op in ltl.TEMPORAL_UNARY + ltl.TEMPORAL_BINARY:
+            raise Unsupported('operator ' + op + ' in ' + str(formula))
+        args = [values[child] for child in node.children()]
+        booleans = [numpy.asarray(arg).dtype == bool for arg in args]
+        if op == 'atom':
+            if node.args[0] not in states.values:
+                raise Unsupported('undeclared name ' + node.args[0])
+            values[node] = states.values[node.args[0]]
+        elif op == 'const':
+            values[node] = numpy.bool_(node.args[0] == 'TRUE')
+        elif op == 'int':
+            values[node] = numpy.int64(node.args[0])
+        elif op in ('!', '&', '|', '->', '<->', 'xnor', 'xor'):
+            if not all(booleans):
+                raise Unsupported('non-boolean operand of ' + op + ' in ' + str(formula))
+            if op == '!':
+                values[node] = ~args[0]
+            elif op == '&':
+                values[node] = functools.reduce(numpy.logical_and, args)
+            elif op == '|':
+                values[node] = functools.reduce(numpy.logical_or, args)
+            elif op == '->':
+                values[node] = ~args[0] | args[1]
+            else:
+                values[node] = (args[0] == args[1]) if op != 'xor' else (args[0] != args[1])
+        elif op in COMPARISONS:
+            if booleans[0] != booleans[1] or booleans[0] and op not in ('=', '!='):
+                raise Unsupported('ill-typed operands of ' + op + ' in ' + str(formula))
+            values[node] = {'=': numpy.equal, '!=': numpy.not_equal, '<': numpy.less, '<=': numpy.less_equal,
+                            '>': numpy.greater, '>=': numpy.greater_equal}[op](args[0], args[1])
+        elif op in ARITHMETIC or op == 'neg':
+            if any(booleans):
+                raise Unsupported('boolean operand of ' + op + ' in ' + str(formula))
+            values[node] = -args[0] if op == 'neg' else ARITHMETIC[op](args[0], args[1])
+        else:
+            raise Unsupported('operator ' + op + ' in ' + str(formula))
+    return values[formula]
+
+
+def holds(variables, formula):
+    """Decides whether an LTL specification holds on every path of the model of variables
+
+    Args:
+        variables: variables involved in the specification
+        formula: a formula object
+
+    Returns:
+        True if formula holds, False otherwise
+
+    Raises:
+        Unsupported: if formula or a variable type is outside the supported fragment
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise Unsupported('numpy is not installed')
+
+    temporal = []
+    for node in ltl.postorder(formula):
+        if node.op in ('G', 'F') and node not in temporal:
+            if any(child.op in ltl.TEMPORAL_UNARY + ltl.TEMPORAL_BINARY for child in ltl.postorder(node.args[0])):
+                raise Unsupported('nested temporal operators in ' + str(formula))
+            temporal.append(node)
+    if len(temporal) > MAX_TEMPORAL:
+        raise Unsupported(str(len(temporal)) + ' temporal subformulas')
+
+    states = States(variables, ltl.atoms(formula) & set(dict(variables)))
+    operands = [states.mask(evaluate(states, node.args[0], {})) for node in temporal]
+    everywhere = numpy.ones(int(numpy.prod(states.shape)), dtype=bool)
+
+    for truths in itertools.product((False, True), repeat=len(temporal)):
+        # states allowed in S by the G subformulas that hold and the F subformulas that do not
+        allowed = everywhere.copy()
+        for node, operand, truth in zip(temporal, operands, truths):
+            if (node.op == 'G') == truth:
+                allowed &= operand if truth else ~operand
+        # S needs a state outside each G subformula that fails and inside each F subformula that holds
+        if not all((allowed & ~operand).any() if node.op == 'G' else (allowed & operand).any()
+                   for node, operand, truth in zip(temporal, operands, truths) if (node.op == 'G') != truth):
+            continue
+        values = states.mask(evaluate(states, formula, dict(zip(temporal, truths))))
+        if (allowed & ~values).any():
+            return False
+    return True
+
+
+def tighten(variables, specs):
+    """Cuts the ranges of the integer variables compared only with constants one past the smallest and the largest
+    of them
+
+    Args:
+        variables: a list of tuples containing variables and their types
+        specs: a list of formula objects, the specifications of the model
+
+    Returns:
+        A list of tuples containing the variables and their tightened types, in the same order
+    """
+    ranges = {}
+    for (var, type) in variables:
+        match = RANGE.match(type)
+        if match:
+            ranges[var] = (int(match.group(1)), int(match.group(2)))
+
+    constants, opaque = {}, set()
+    visited = set()
+    for spec in specs:
+        for node in ltl.postorder(spec):
+            if node in visited:
+                continue
+            visited.add(node)
+            if node.op == 'raw':
+                opaque |= ltl.atoms(node)
+                continue
+            names = [child.args[0] for child in node.children() if child.op == 'atom' and child.args[0] in ranges]
+            if not names:
+                continue
+            bound = [_constant(child) for child in node.args] if node.op in COMPARISONS else []
+            if len(names) == 1 and len(bound) == 2 and (bound[0] is None) != (bound[1] is None):
+                constants.setdefault(names[0], set()).add(bound[0] if bound[0] is not None else bound[1])
+            else:
+                opaque.update(names)
+
+    tightened = []
+    for (var, type) in variables:
+        if var in constants and var not in opaque:
+            low, high = ranges[var]
+            low, high = max(low, min(min(constants[var]) - 1, high)), min(high, max(max(constants[var]) + 1, low))
+            type = str(low) + '..' + str(high)
+        tightened.append((var, type))
+    return tightened
+
+
+def _constant(node):
+    """Returns the value of an integer constant, None if node is not one"""
+    if node.op == 'int':
+        return node.args[0]
+    if node.op == 'neg' and node.args[0].op == 'int':
+        return -node.args[0].args[0]
+    return None
@@ -0,0 +1,78 @@
+"""Memfile module provides in-memory files for the generated models, that the model checkers open by path without
+the models ever being written to disk
+
+On Linux each file is an anonymous memfd, reachable by the processes of the same user through /proc. Elsewhere it
+falls back to a temporary file, on tmpfs when /dev/shm exists."""
+
+import os, tempfile, threading
+
+SHARED_MEMORY = '/dev/shm'
+
+# descriptors of the in-memory files by path, and the files attached to each of them by extension
+_files = {}
+_companions = {}
+_lock = threading.RLock()
+
+
+def memory_file(name='model'):
+    """Creates an empty in-memory file
+
+    Args:
+        name: a string shown in /proc and in the name of the fallback file, only for debugging
+
+    Returns:
+        The path of the file, it can be opened, rewritten and passed to other processes like any other path
+    """
+    if hasattr(os, 'memfd_create') and os.path.isdir('/proc/self/fd'):
+        descriptor = os.memfd_create(name)
+        path = '/proc/' + str(os.getpid()) + '/fd/' + str(descriptor)
+    else:
+        directory = SHARED_MEMORY if os.path.isdir(SHARED_MEMORY) else None
+        descriptor, path = tempfile.mkstemp(prefix=name + '_', suffix='.smv', dir=directory)
+    with _lock:
+        _files[path] = descriptor
+    return path
+
+
+def is_memory_file(path):
+    """Returns True if path is an in-memory file created by memory_file"""
+    return path in _files
+
+
+def companion(path, extension):
+    """Returns the path of the file storing extra data about path, such as its variable order or a command script
+
+    The companion of a file on disk is the file with the same name and the given extension, the companion of an
+    in-memory file is another in-memory file, created the first time it is asked for.
+    """
+    if not is_memory_file(path):
+        return os.path.splitext(path)[0] + extension
+    with _lock:
+        if (path, extension) not in _companions:
+            _companions[(path, extension)] = memory_file(os.path.basename(path) + extension)
+        return _companions[(path, extension)]
+
+
+def exists(path):
+    """Returns True if path exists and, for in-memory files, is not empty"""
+    if is_memory_file(path):
+        return os.fstat(_files[path]).st_size > 0
+    return os.path.exists(path)
+
+
+def remove(path):
+    """Removes a file, releasing the memory of in-memory files together with their companions"""
+    with _lock:
+        descriptor = _files.pop(path, None)
+        attached = [key for key in _companions if path in (key[0], _companions[key])]
+        attached = [_companions.pop(key) for key in attached]
+    if descriptor is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    os.close(descriptor)
+    if not path.startswith('/proc/'):
+        os.remove(path)
+    for other in attached:
+        if other != path:
+            remove(other)
@@ -1,8 +1,17 @@
 """Operations module provides LTL operations to test contracts"""
 
+import copy, threading
+from collections import OrderedDict
 from LTL_contracts.src import contract
+from LTL_contracts.src import formula as ltl
 from LTL_contracts.src.core import *
 
+# composites built by composition and conjunction, least recently used first, keyed by the operation and the
+# fingerprints of the operands
+composite_cache = OrderedDict()
+COMPOSITE_CACHE_SIZE = 256
+composite_lock = threading.Lock()
+
 
 def compatibility(contract):
     """Checks the compatibility of a contract object
@@ -11,9 +20,9 @@ def compatibility(contract):
         contract: a contract object
 
     Returns:
-        A string LTL expression that checks the compatibility of the input
+        A LTL formula that checks the compatibility of the input
     """
-    return _ltl_inv(contract.get_assumptions())
+    return _inv(contract.get_assumptions())
 
 def consistency(contract):
     """Checks the consistency of a contract object
@@ -22,9 +31,9 @@ def consistency(contract):
         contract: a contract object
 
     Returns:
-        A string LTL expression that checks the consistency of the input
+        A LTL formula that checks the consistency of the input
     """
-    return _ltl_inv(contract.get_guarantees())
+    return _inv(contract.get_guarantees())
 
 
 def satisfiability(contract):
@@ -34,9 +43,9 @@ def satisfiability(contract):
         contract: a contract object
 
     Returns:
-        A string LTL expression that checks the satisfiability of the input
+        A LTL formula that checks the satisfiability of the input
     """
-    return _ltl_inv(_and(contract.get_assumptions(), contract.get_guarantees()))
+    return _inv(_and(contract.get_assumptions(), contract.get_guarantees()))
 
 
 
@@ -48,10 +57,10 @@ def refinement(acontract, bcontract):
         bcontract: a contract object
 
     Returns:
-        A string LTL expression that checks if acontract refines bcontract
+        A LTL formula that checks if acontract refines bcontract
     """
-    return _ltl(_and(_imply(bcontract.get_assumptions(), acontract.get_assumptions()),
-                     _imply(acontract.get_guarantees(), bcontract.get_guarantees())))
+    return _and(_imply(bcontract.get_assumptions(), acontract.get_assumptions()),
+                _imply(acontract.get_guarantees(), bcontract.get_guarantees()))
 
 
 def inclusion(aproposition, bproposition):
@@ -62,9 +71,9 @@ def inclusion(aproposition, bproposition):
         bproposition: a logic proposition
 
     Returns:
-        A string LTL expression that checks if aproposition is included in bproposition
+        A LTL formula that checks if aproposition is included in bproposition
     """
-    return _ltl(_imply(aproposition, bproposition))
+    return _imply(aproposition, bproposition)
 
 def saturation(contract):
     """Perform a saturation operation on a contract
@@ -77,6 +86,10 @@ def saturation(contract):
 def composition(contracts):
     """Perform a composition operation on a list of contracts
 
+    The composition is built in a single pass: its guarantees are the conjunction of all the guarantees and its
+    assumptions are the conjunction of all the assumptions or the negation of its guarantees, which is equivalent to
+    composing the contracts pairwise from left to right.
+
     Args:
         contracts: a list of contract objects
 
@@ -86,16 +99,18 @@ def composition(contracts):
     contracts = list(contracts)
     if len(contracts) == 1:
         return contracts[0]
-    else:
-        comp = contract.Contract()
-        comp.add_name(contracts[0].name + '_comp_' + contracts[1].name)
-        comp.add_variables(_merge(contracts[0].variables, contracts[1].variables))
-        comp.add_assumption(_or(_and(contracts[0].get_assumptions(), contracts[1].get_assumptions()),
-                            _inv(_and(contracts[0].get_guarantees(), contracts[1].get_guarantees()))))
-        comp.add_guarantee(_and(contracts[0].get_guarantees(), contracts[1].get_guarantees()))
-        contracts.pop(0) #remove first element in list
-        contracts[0] = comp #replace "new" first element with conj
-        return composition(contracts)
+    return _memoized('composition', _compose, contracts)
+
+
+def _compose(contracts):
+    """Builds the composition of a list of at least two contracts"""
+    comp = contract.Contract()
+    comp.add_name('_comp_'.join([c.name for c in contracts]))
+    comp.add_variables(_merge(*[c.variables for c in contracts]))
+    guarantees = _and_all([c.get_guarantees() for c in contracts])
+    comp.add_assumption(_or(_and_all([c.get_assumptions() for c in contracts]), _inv(guarantees)))
+    comp.add_guarantee(guarantees)
+    return comp
 
 
 def simplify(variables, assumptions, guarantees):
@@ -109,13 +124,16 @@ def simplify(variables, assumptions, guarantees):
     simplified_assumptions = []
     simplified_guarantees = []
 
-    for i, assumption in enumerate(assumptions):
-        for j, guarantee in enumerate(guarantees):
-            # check if all the behaviours of the assumptions are included in the guarantees
-            # if not, then add the assumptions, otherwise simplify them
-            if not check_inclusion(variables, guarantee, assumption):
-                simplified_assumptions.append(assumption)
-                simplified_guarantees.append(guarantee)
+    pairs = [(assumption, guarantee) for assumption in assumptions for guarantee in guarantees]
+
+    # check if all the behaviours of the assumptions are included in the guarantees, with a single NuSMV run
+    # if not, then add the assumptions, otherwise simplify them
+    included = check_inclusions(variables, [(guarantee, assumption) for assumption, guarantee in pairs])
+
+    for (assumption, guarantee), is_included in zip(pairs, included):
+        if not is_included:
+            simplified_assumptions.append(assumption)
+            simplified_guarantees.append(guarantee)
 
     return simplified_assumptions, simplified_guarantees
 
@@ -129,26 +147,31 @@ def composition_simplify(contracts):
     Returns:
         A contract object that is the composition of whole list
     """
-    variables = []
-    for contract in contracts:
-        variables = list(set(variables) | set(contract.variables))
-
     contracts = list(contracts)
+    variables = _merge(*[c.variables for c in contracts])
+
     # list of list of assumptions for each contract involved in the composition
     assumptions = [contract.get_assumptions_list() for contract in contracts]
 
     # list of list of guarantees for each contract involved in the composition
     guarantees = [contract.get_guarantees_list() for contract in contracts]
 
-    simplified_assumptions = []
-    simplified_guarantees_orneg = []
-
+    # all the (assumption, guarantee) pairs share the same variables, so they are checked in a single batch
+    pairs = []
     for i, assumption in enumerate(assumptions):
         for j, guarantee in enumerate(guarantees):
             if i != j:
-                simplified_a, simplified_g = simplify(variables, assumption, guarantee)
-                simplified_assumptions.extend(simplified_a)
-                simplified_guarantees_orneg.extend(simplified_g)
+                pairs.extend([(a, g) for a in assumption for g in guarantee])
+
+    included = check_inclusions(variables, [(g, a) for a, g in pairs])
+
+    simplified_assumptions = []
+    simplified_guarantees_orneg = []
+
+    for (a, g), is_included in zip(pairs, included):
+        if not is_included:
+            simplified_assumptions.append(a)
+            simplified_guarantees_orneg.append(g)
 
     comp = Contract()
     name = ""
@@ -174,47 +197,80 @@ def conjunction(contracts):
     Returns:
         A contract object that is the conjunction of whole list
     """
+    contracts = list(contracts)
     if len(contracts) == 1:
         return contracts[0]
-    else:
-        conj = contract.Contract()
-        conj.add_name(contracts[0].name + "_conj_" + contracts[1].name)
-        conj.add_variables(_merge(contracts[0].variables, contracts[1].variables))
-        conj.add_assumption(_or(contracts[0].get_assumptions(), contracts[1].get_assumptions()))
-        conj.add_guarantee(_and(contracts[0].get_guarantees(), contracts[1].get_guarantees()))
-        contracts.pop(0) #remove first element in list
-        contracts[0] = conj #replace "new" first element with conj
-        return conjunction(contracts)
-
-def _merge(alist, blist):
-    """Merges input lists and removes duplicates"""
-    return list(set(alist) | set(blist))
-
-def _ltl(astr):
-    """Applies an inverted LTLSPEC wrapper to the input string"""
-    return '\tLTLSPEC ' + astr + ';\n'
-
-def _ltl_inv(astr):
-    """Applies an inverted LTLSPEC wrapper to the input string"""
-    return '\tLTLSPEC !' + astr + ';\n'
-
-def _and(astr, bstr):
-    """Returns logical and of astr and bstr"""
-    # TODO: string equality, astr and bstr might contain more than TRUE
-    if 'TRUE' in astr:
-        return bstr
-    if 'TRUE' in bstr:
-        return astr
-    return '(' + astr + ' & ' + bstr + ')'
-
-def _or(astr, bstr):
-    """Returns logical or of astr and bstr"""
-    return '(' + astr + ' | ' + bstr + ')'
-
-def _imply(astr, bstr):
-    """Returns logical implication of bstr by astr"""
-    return '(' + astr + ' -> ' + bstr + ')'
-
-def _inv(astr):
+    return _memoized('conjunction', _conjoin, contracts)
+
+
+def _conjoin(contracts):
+    """Builds the conjunction of a list of at least two contracts"""
+    conj = contract.Contract()
+    conj.add_name('_conj_'.join([c.name for c in contracts]))
+    conj.add_variables(_merge(*[c.variables for c in contracts]))
+    conj.add_assumption(ltl.Or(*[c.get_assumptions() for c in contracts]))
+    conj.add_guarantee(_and_all([c.get_guarantees() for c in contracts]))
+    return conj
+
+def fingerprint(contract):
+    """Returns the fingerprint of a contract, its structural hash, which changes whenever the contract is changed"""
+    return contract.fingerprint()
+
+
+def _memoized(operation, build, contracts):
+    """Returns the composite of contracts built by operation, reusing the one built for the same operands
+
+    The operands are identified by their fingerprints, so an entry is no longer found once one of its contracts is
+    changed, for instance with add_assumption or add_guarantee. The cached composite is never handed out, each
+    caller gets its own copy and may change it.
+
+    Args:
+        operation: a string name of the operation
+        build: the function building the composite of a list of contracts
+        contracts: a list of contract objects
+
+    Returns:
+        A new contract object
+    """
+    key = (operation,) + tuple(fingerprint(c) for c in contracts)
+    with composite_lock:
+        entry = composite_cache.get(key)
+        if entry is not None and entry[0] == contracts:
+            composite_cache.move_to_end(key)
+            return copy.copy(entry[1])
+    composite = build(contracts)
+    with composite_lock:
+        composite_cache[key] = (contracts, copy.copy(composite))
+        if len(composite_cache) > COMPOSITE_CACHE_SIZE:
+            composite_cache.popitem(last=False)
+    return composite
+
+
+def _merge(*lists):
+    """Merges input lists and removes duplicates, keeping the first occurrence order"""
+    return contract.merge_variables(*lists)
+
+def _and(aformula, bformula):
+    """Returns logical and of aformula and bformula"""
+    aformula, bformula = ltl.lift(aformula), ltl.lift(bformula)
+    if aformula is ltl.TRUE:
+        return bformula
+    if bformula is ltl.TRUE:
+        return aformula
+    return ltl.And(aformula, bformula)
+
+def _and_all(formulas):
+    """Returns the n-ary logical and of formulas"""
+    return ltl.And(*[f for f in formulas if f is not ltl.TRUE])
+
+def _or(aformula, bformula):
+    """Returns logical or of aformula and bformula"""
+    return ltl.Or(ltl.lift(aformula), ltl.lift(bformula))
+
+def _imply(aformula, bformula):
+    """Returns logical implication of bformula by aformula"""
+    return ltl.Implies(ltl.lift(aformula), ltl.lift(bformula))
+
+def _inv(aformula):
     """Returns logical not of input"""
-    return '!' + astr
+    return ltl.Not(ltl.lift(aformula))
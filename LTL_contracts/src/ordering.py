@@ -0,0 +1,127 @@
+"""Ordering module computes a static BDD variable order for the generated models, placing close to each other the
+variables that occur together in the specifications
+
+The interaction graph has an edge between two variables for each maximal temporal-free subformula and each
+outermost temporal subformula where both occur, and the order is its reverse Cuthill-McKee numbering, which keeps
+the bandwidth of the graph small. Ties are broken by name, so the same model always gets the same order."""
+
+import re
+from collections import deque
+from LTL_contracts.src import formula as ltl
+
+BOOLEAN = ('!', '&', '|', '->', '<->', 'xor', 'xnor')
+
+# a bit of a scalar variable in the order files written by NuSMV
+BIT = re.compile(r'^(.+)\.\d+$')
+
+
+def interaction_graph(names, specs):
+    """Returns the weighted interaction graph of the variables
+
+    Args:
+        names: a list of variable names, the nodes of the graph
+        specs: a list of formula objects
+
+    Returns:
+        A dictionary mapping each name to a dictionary from its neighbors to the number of shared subformulas
+    """
+    graph = dict((name, {}) for name in names)
+    for group in _groups(specs):
+        members = sorted(ltl.atoms(group) & set(graph))
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                graph[a][b] = graph[a].get(b, 0) + 1
+                graph[b][a] = graph[b].get(a, 0) + 1
+    return graph
+
+
+def _groups(specs):
+    """Yields the maximal temporal-free subformulas of the specs and their outermost subformulas that are not boolean
+    connectives, typically the temporal formulas of the patterns"""
+    temporal_free = {}
+    for spec in specs:
+        for node in ltl.postorder(spec):
+            if node not in temporal_free:
+                temporal_free[node] = node.op not in ltl.TEMPORAL_UNARY + ltl.TEMPORAL_BINARY and \
+                    all(temporal_free[child] for child in node.children())
+                if not temporal_free[node]:
+                    for child in node.children():
+                        if temporal_free[child]:
+                            yield child
+        if temporal_free[spec]:
+            yield spec
+        operands, visited = [spec], set()
+        while operands:
+            operand = operands.pop()
+            if operand in visited:
+                continue
+            visited.add(operand)
+            if operand.op in BOOLEAN:
+                operands.extend(operand.args)
+            else:
+                yield operand
+
+
+def reverse_cuthill_mckee(graph):
+    """Returns the nodes of graph in reverse Cuthill-McKee order
+
+    Each connected component is numbered by a breadth-first search from one of its nodes of minimum degree,
+    visiting the neighbors by increasing degree, and the whole numbering is reversed.
+    """
+    degree = dict((name, len(neighbors)) for name, neighbors in graph.items())
+    order, visited = [], set()
+    for start in sorted(graph, key=lambda name: (degree[name], name)):
+        if start in visited:
+            continue
+        visited.add(start)
+        queue = deque([start])
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for neighbor in sorted(graph[name], key=lambda other: (degree[other], -graph[name][other], other)):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
+    return order[::-1]
+
+
+def bandwidth(graph, order):
+    """Returns the maximum distance in order between two adjacent variables"""
+    position = dict((name, i) for i, name in enumerate(order))
+    return max([abs(position[a] - position[b]) for a in graph for b in graph[a]] + [0])
+
+
+def static_order(names, specs):
+    """Returns the variable names in the static order computed from the specs"""
+    return reverse_cuthill_mckee(interaction_graph(names, specs))
+
+
+def read_order(ordfile):
+    """Returns the variable names in an order file, such as the one written by NuSMV -o after dynamic reordering
+
+    Bits of scalar variables are collapsed into their variable, at the position of its first bit.
+    """
+    names = []
+    with open(ordfile) as ifile:
+        for line in ifile:
+            name = line.split('--')[0].strip()
+            if name:
+                match = BIT.match(name)
+                name = match.group(1) if match else name
+                if name not in names:
+                    names.append(name)
+    return names
+
+
+def learned_order(names, specs, ordfile):
+    """Returns the variable names in the order of ordfile, followed in static order by the ones it does not list"""
+    known = [name for name in read_order(ordfile) if name in names]
+    rest = [name for name in static_order(names, specs) if name not in known]
+    return known + rest
+
+
+def write_order(ordfile, names):
+    """Writes the variable names to ordfile, one per line, in the format read by NuSMV -i"""
+    with open(ordfile, 'w') as ofile:
+        for name in names:
+            ofile.write(name + '\n')
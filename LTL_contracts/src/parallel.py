@@ -0,0 +1,85 @@
+"""Parallel module runs the checks of a Checks object on a pool of worker processes, each one with its own
+NuSMV model file
+
+Each shard is decided by core.verify, so the checks go through the same router, in-process engines and model
+checker as in a sequential run. The verdict cache is only read and written by the parent process."""
+
+import os, multiprocessing
+from LTL_contracts.src import core, memfile
+from LTL_contracts.src.check import Checks
+from LTL_contracts.src.session import SessionPool
+
+# number of shards created for each worker, more shards balance better checks of different cost
+SHARDS_PER_WORKER = 4
+
+
+def run_parallel(variables, checks, processes=None):
+    """Shards the checks across a pool of processes and merges their results in order
+
+    Args:
+        variables: variables involved in the checks
+        checks: a checks object containing all the desired checks on the system
+        processes: the number of worker processes, defaults to the number of CPUs
+
+    Returns:
+        A list of results, in the same order and format of the list returned by core.verify
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    cache = core.verdict_cache
+    keys = [cache.key(variables, check) for check in checks.checks] if cache is not None else []
+    results = [cache.get(key) for key in keys] if cache is not None else [None] * len(checks.checks)
+
+    missing = Checks()
+    for check, result in zip(checks.checks, results):
+        if result is None:
+            missing.add_check(check)
+    if not missing.checks:
+        return results
+
+    shards = _shard(missing, processes * SHARDS_PER_WORKER)
+    if processes == 1 or len(shards) <= 1:
+        shard_results = [_run_shard((variables, missing))]
+    else:
+        pool = multiprocessing.Pool(min(processes, len(shards)), _init_worker, (core.session_pool is not None,))
+        try:
+            shard_results = pool.map(_run_shard, [(variables, shard) for shard in shards])
+        finally:
+            pool.close()
+            pool.join()
+
+    fresh = iter([result for shard_result in shard_results for result in shard_result])
+    for i in range(len(results)):
+        if results[i] is None:
+            results[i] = next(fresh)
+            if cache is not None and results[i] is not None:
+                cache.put(keys[i], results[i])
+    return results
+
+
+def _shard(checks, nshards):
+    """Splits the checks in at most nshards contiguous Checks objects"""
+    size = -(-len(checks.checks) // max(nshards, 1))
+    shards = []
+    for start in range(0, len(checks.checks), max(size, 1)):
+        shard = Checks()
+        for check in checks.checks[start:start + size]:
+            shard.add_check(check)
+        shards.append(shard)
+    return shards
+
+
+def _init_worker(sessions):
+    """Gives each worker its own session pool, the one inherited from the parent is not usable after fork"""
+    core.session_pool = SessionPool(1) if sessions else None
+
+
+def _run_shard(args):
+    """Verifies the shard in a private in-memory model file, the verdict cache is left to the parent process"""
+    variables, checks = args
+    smvfile = memfile.memory_file('checks')
+    try:
+        return core.verify(variables, checks, smvfile, cache=False)
+    finally:
+        memfile.remove(smvfile)
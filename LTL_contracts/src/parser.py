@@ -4,9 +4,10 @@ import subprocess, re
 from LTL_contracts.src.cgt import Cgt
 from LTL_contracts.src.contract import Contract, Contracts
 from LTL_contracts.src.check import Compatibility, Consistency, Refinement, Checks, Satisfiability
+from LTL_contracts.src.memfile import memory_file
 
 
-smv_file = "../checks_smtfile.smv"
+smv_file = memory_file("checks_smtfile")
 
 
 # contract file attributes
@@ -16,15 +16,59 @@ from itertools import combinations
 class PatternError(object):
     pass
 
+
+# encoding of the locations of the movement patterns:
+# 'boolean' declares a boolean variable for each location,
+# 'enum' folds the locations into the enumerated variable LOCATION_VARIABLE, shared by all the patterns, whose values
+# are merged across the contracts declaring it, so that a location is the same in every pattern as with booleans
+LOCATION_ENCODING = 'boolean'
+LOCATION_VARIABLE = 'loc_'
+
+# prefix of the values of the enumerated location variables, enumeration constants share the namespace of the
+# variables so a location value must not be the name of a boolean variable, such as the trigger of a reaction
+LOCATION_PREFIX = 'at_'
+
+# value of the enumerated location variable when the robot is in none of the declared locations
+LOCATION_NONE = LOCATION_PREFIX + '_none'
+
+
 class Pattern(Cgt):
     """
     General Pattern Class
     """
-    def __init__(self, name):
+
+    __slots__ = ('encoding', 'locations')
+
+    def __init__(self, name, encoding=None):
+        """
+        :param encoding: 'boolean' or 'enum' location encoding, defaults to LOCATION_ENCODING
+        """
         super().__init__()
         self.name = name
+        self.encoding = encoding or LOCATION_ENCODING
+        self.locations = []
         self.add_assumption("TRUE")
 
+    def add_location(self, location):
+        """
+        Declare a location where the robot can be
+        """
+        if location not in self.locations:
+            self.locations.append(location)
+        if self.encoding == 'enum':
+            values = '{' + LOCATION_NONE + ', ' + LOCATION_PREFIX + location + '}'
+            self.variables = merge_variables(self.variables, [(LOCATION_VARIABLE, values)])
+        else:
+            self.add_variable((location, 'boolean'))
+
+    def at(self, location):
+        """
+        :return: the proposition that holds when the robot is at location
+        """
+        if self.encoding == 'enum':
+            return "(" + LOCATION_VARIABLE + " = " + LOCATION_PREFIX + location + ")"
+        return location
+
 
 
 class CoreMovement(Pattern):
@@ -33,17 +77,20 @@ class CoreMovement(Pattern):
     All the variables are locations where there robot can be at a certain time
     """
 
+    __slots__ = ()
+
     def add_physical_assumptions(self):
         """
         Add the assumptions that the robot cannot be at multiple locations at the same time
         """
 
-        list_locations = []
-        for location in self.get_variables():
-            list_locations.append(location[0])
-
         # Eliminating duplicates
-        list_locations = list(dict.fromkeys(list_locations))
+        list_locations = list(dict.fromkeys(self.locations))
+
+        if self.encoding == 'enum':
+            # the shared enumerated variable already excludes multiple locations, constraining it to the locations of
+            # this pattern would exclude the ones of the other patterns
+            return
 
         ltl_formula = "G("
         for i, loc in enumerate(list_locations):
@@ -66,38 +113,42 @@ class Visit(CoreMovement):
     Visit a set of locations in an unspecified order.
     """
 
-    def __init__(self, name, list_of_locations=None):
+    __slots__ = ()
+
+    def __init__(self, name, list_of_locations=None, encoding=None):
         """
         :type list_of_locations: list of location, each location is a boolean
         indicating if the robot is at that location
         """
-        super().__init__(name)
+        super().__init__(name, encoding)
         if list_of_locations is None:
             raise PatternError
 
         for location in list_of_locations:
-            self.add_variable((location, 'FALSE'))
-            self.add_guarantee("F(" + location + ")")
+            self.add_location(location)
+            self.add_guarantee("F(" + self.at(location) + ")")
 
 class SequencedVisit(CoreMovement):
     """
     Visit a set of locations in sequence, one after the other.
     """
 
-    def __init__(self, name, list_of_locations=None):
+    __slots__ = ()
+
+    def __init__(self, name, list_of_locations=None, encoding=None):
         """
         :type list_of_locations: list of location, each location is a boolean
         indicating if the robot is at that location
         """
-        super().__init__(name)
+        super().__init__(name, encoding)
         if list_of_locations is None:
             raise PatternError
 
         guarantee = "F("
         for n, location in enumerate(list_of_locations):
-            self.add_variable((location, 'FALSE'))
+            self.add_location(location)
 
-            guarantee += location
+            guarantee += self.at(location)
             if n == len(list_of_locations) - 1:
                 for _ in range(len(list_of_locations)):
                     guarantee += ")"
@@ -114,21 +165,22 @@ class OrderedVisit(CoreMovement):
     before its predecessor.
     """
 
+    __slots__ = ()
 
-    def __init__(self, name, list_of_locations=None):
+    def __init__(self, name, list_of_locations=None, encoding=None):
         """
         :type list_of_locations: list of location, each location is a boolean
         indicating if the robot is at that location
         """
-        super().__init__(name)
+        super().__init__(name, encoding)
         if list_of_locations is None:
             raise PatternError
 
         guarantee = "F("
         for n, location in enumerate(list_of_locations):
-            self.add_variable((location, 'boolean'))
+            self.add_location(location)
 
-            guarantee += location
+            guarantee += self.at(location)
             if n == len(list_of_locations) - 1:
                 for _ in range(len(list_of_locations)):
                     guarantee += ")"
@@ -139,31 +191,36 @@ class OrderedVisit(CoreMovement):
 
         for n, location in enumerate(list_of_locations):
             if n < len(list_of_locations)-1:
-                self.add_guarantee("!" + list_of_locations[n+1] + " U " + list_of_locations[n])
+                self.add_guarantee("!" + self.at(list_of_locations[n+1]) + " U " + self.at(list_of_locations[n]))
 
 class GlobalAvoidance(Pattern):
     """
     Visit a set of locations in an unspecified order.
     """
 
-    def __init__(self, name, list_of_locations=None):
+    __slots__ = ()
+
+    def __init__(self, name, list_of_locations=None, encoding=None):
         """
         :type list_of_locations: list of location, each location is a boolean
         indicating if the robot is at that location
         """
-        super().__init__(name)
+        super().__init__(name, encoding)
         if list_of_locations is None:
             raise PatternError
 
         for location in list_of_locations:
-            self.add_variable((location, 'boolean'))
-            self.add_guarantee("G(!" + location + ")")
+            self.add_location(location)
+            self.add_guarantee("G(!" + self.at(location) + ")")
 
 
 class DelayedReaction(Pattern):
     """
     Delayed Reaction Pattern
     """
+
+    __slots__ = ()
+
     def __init__(self, name, trigger=None, reaction=None):
         """
 
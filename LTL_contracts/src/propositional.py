@@ -0,0 +1,168 @@
+"""Propositional module decides in process, with Z3, the LTL specifications that contain no temporal operator
+
+Without temporal operators a specification only constrains the initial state, and since the generated models have
+no INIT or ASSIGN section every assignment of the declared variables is an initial state: the specification holds
+if and only if it is valid over the variable domains."""
+
+import re, threading
+import z3
+from LTL_contracts.src import formula as ltl
+
+RANGE = re.compile(r'^\s*(-?\d+)\s*\.\.\s*(-?\d+)\s*$')
+
+# the engines deciding in process share the default Z3 context, which is not thread-safe, so concurrent checks take
+# turns on it
+z3_lock = threading.RLock()
+
+COMPARISONS = {'=': lambda a, b: a == b, '!=': lambda a, b: a != b,
+               '<': lambda a, b: a < b, '<=': lambda a, b: a <= b,
+               '>': lambda a, b: a > b, '>=': lambda a, b: a >= b}
+ARITHMETIC = {'+': lambda a, b: a + b, '-': lambda a, b: a - b, '*': lambda a, b: a * b,
+              '/': lambda a, b: _divide(a, b), 'mod': lambda a, b: a - b * _divide(a, b)}
+
+
+def _divide(a, b):
+    """Returns the quotient of the z3 integers a and b truncated toward zero, as NuSMV computes it"""
+    # z3 division is Euclidean, it only agrees with truncation for a nonnegative dividend
+    return z3.If(a >= 0, a / b, -((-a) / b))
+
+
+class Unsupported(Exception):
+    """Raised when a formula or a variable type is outside the fragment handled in process"""
+    pass
+
+
+def is_propositional(formula):
+    """Returns True if formula contains no temporal operator and no opaque text"""
+    return all(node.op not in ltl.TEMPORAL_UNARY + ltl.TEMPORAL_BINARY and node.op != 'raw'
+               for node in ltl.postorder(formula))
+
+
+class Encoder(object):
+    """Encoder translates formulas over the declared variables into Z3 expressions
+
+    Attributes:
+        variables: a dictionary mapping each variable name to its NuSMV type
+        suffix: a string appended to the Z3 variable names, to encode the same variables at different instants
+        terms: a dictionary mapping each variable name to its Z3 term
+        constants: a dictionary mapping each enumeration value to its integer code
+    """
+
+    def __init__(self, variables, suffix=''):
+        """Initialize an encoder, only the variables actually used are created in Z3"""
+        self.variables = dict(variables)
+        self.suffix = suffix
+        self.terms = {}
+        self.constraints = []
+        self.constants = {}
+        for (_, type) in variables:
+            if type.strip().startswith('{'):
+                for value in type.strip()[1:-1].split(','):
+                    self.constants.setdefault(value.strip(), len(self.constants))
+
+    def term(self, name):
+        """Returns the Z3 term of a variable, declaring it and its domain constraint the first time"""
+        if name in self.terms:
+            return self.terms[name]
+        type = self.variables[name].strip()
+        symbol = name + self.suffix
+        if type == 'boolean':
+            term = z3.Bool(symbol)
+        elif type == 'real':
+            term = z3.Real(symbol)
+        elif type == 'integer':
+            term = z3.Int(symbol)
+        elif RANGE.match(type):
+            low, high = [int(bound) for bound in RANGE.match(type).groups()]
+            term = z3.Int(symbol)
+            self.constraints.append(z3.And(term >= low, term <= high))
+        elif type.startswith('{'):
+            term = z3.Int(symbol)
+            self.constraints.append(z3.Or([term == self.constants[value.strip()]
+                                           for value in type[1:-1].split(',')]))
+        else:
+            raise Unsupported('variable ' + name + ' of type ' + type)
+        self.terms[name] = term
+        return term
+
+    def domain(self):
+        """Returns the conjunction of the domain constraints of the variables encoded so far"""
+        return z3.And(self.constraints) if self.constraints else z3.BoolVal(True)
+
+    def encode(self, formula):
+        """Translates a formula with no temporal operators into Z3
+
+        Args:
+            formula: a formula object
+
+        Returns:
+            A Z3 expression
+        """
+        encoded = {}
+        try:
+            for node in ltl.postorder(formula):
+                encoded[node] = self.encode_node(node, [encoded[child] for child in node.children()])
+        except z3.Z3Exception as error:
+            raise Unsupported('ill-typed formula ' + str(formula) + ': ' + str(error))
+        return encoded[formula]
+
+    def encode_node(self, node, args):
+        """Translates a single node given the Z3 translations of its children"""
+        op = node.op
+        if op == 'atom':
+            name = node.args[0]
+            if name in self.variables:
+                return self.term(name)
+            if name in self.constants:
+                return z3.IntVal(self.constants[name])
+            raise Unsupported('undeclared name ' + name)
+        if op == 'const':
+            return z3.BoolVal(node.args[0] == 'TRUE')
+        if op == 'int':
+            return z3.IntVal(node.args[0])
+        if op == '!':
+            return z3.Not(args[0])
+        if op == '&':
+            return z3.And(args)
+        if op == '|':
+            return z3.Or(args)
+        if op == '->':
+            return z3.Implies(args[0], args[1])
+        if op in ('<->', 'xnor'):
+            return args[0] == args[1]
+        if op == 'xor':
+            return z3.Xor(args[0], args[1])
+        if op in COMPARISONS or op in ARITHMETIC:
+            if op in ('=', '!=') and args[0].sort() != args[1].sort() or \
+                    op not in ('=', '!=') and not (z3.is_arith(args[0]) and z3.is_arith(args[1])):
+                raise Unsupported('ill-typed operands of ' + op + ' in ' + str(node))
+            return COMPARISONS[op](args[0], args[1]) if op in COMPARISONS else ARITHMETIC[op](args[0], args[1])
+        if op == 'neg':
+            return -args[0]
+        if op == 'set':
+            return args
+        if op == 'in':
+            return z3.Or([args[0] == element for element in args[1]])
+        raise Unsupported('operator ' + op)
+
+
+def holds(variables, formula):
+    """Decides whether a specification without temporal operators holds
+
+    Args:
+        variables: variables involved in the specification
+        formula: a propositional formula object
+
+    Returns:
+        True if formula is valid over the variable domains
+
+    Raises:
+        Unsupported: if formula or a variable type is outside the supported fragment
+    """
+    if not is_propositional(formula):
+        raise Unsupported('temporal formula ' + str(formula))
+    encoder = Encoder(variables)
+    solver = z3.Solver()
+    solver.add(z3.Not(encoder.encode(formula)))
+    solver.add(encoder.domain())
+    return solver.check() == z3.unsat
@@ -0,0 +1,178 @@
+"""Rewrite module simplifies the LTL formulas of the checks before they are emitted, no rule makes a formula longer
+
+The rules are constant propagation, flattening of nested conjunctions and disjunctions, idempotence, complement,
+absorption, double negation elimination, pushing negations through the temporal operators and the comparisons,
+and factoring the antecedent shared by several implications, which removes the copies of the assumptions left by
+saturated guarantees. Every rule preserves the LTL semantics on infinite paths. Pushing a negation may create a node
+that is no longer shared with the positive occurrences, so the distinct nodes of a list of formulas can grow slightly
+while their text shrinks."""
+
+from collections import namedtuple
+from LTL_contracts.src import formula as ltl
+
+TRUE, FALSE = ltl.TRUE, ltl.FALSE
+
+# negation of each comparison operator
+NEGATED_COMPARISON = {'=': '!=', '!=': '=', '<': '>=', '>=': '<', '>': '<=', '<=': '>'}
+
+# negation of each temporal operator, as a function of the negated operand: !G a = F !a, !F a = G !a, !X a = X !a
+NEGATED_TEMPORAL = {'G': 'F', 'F': 'G', 'X': 'X'}
+
+# sizes of a list of formulas before and after the rewriting, in distinct nodes and in characters of NuSMV text
+Reduction = namedtuple('Reduction', ['nodes_before', 'nodes_after', 'chars_before', 'chars_after'])
+
+
+class Rewriter(object):
+    """Rewriter simplifies formulas bottom-up, memoizing the result of each node
+
+    Attributes:
+        memo: a dictionary mapping each node rewritten so far to its simplified form
+    """
+
+    def __init__(self):
+        self.memo = {}
+
+    def simplify(self, formula):
+        """Returns the simplified form of formula"""
+        for node in ltl.postorder(formula):
+            if node not in self.memo:
+                if node.is_leaf() or node.op == 'set':
+                    self.memo[node] = node
+                else:
+                    self.memo[node] = self.build(node.op, [self.memo[child] for child in node.args])
+        return self.memo[formula]
+
+    def build(self, op, args):
+        """Returns the simplified node with operator op over the already simplified args"""
+        if op == '!':
+            return self.negate(args[0])
+        if op in ('&', '|'):
+            return self.junction(op, args)
+        if op == '->':
+            return self.implication(args[0], args[1])
+        if op in ('G', 'F'):
+            operand = args[0]
+            if operand in (TRUE, FALSE) or operand.op == op:
+                return operand
+            return ltl.Formula(op, operand)
+        if op == 'X' and args[0] in (TRUE, FALSE):
+            return args[0]
+        if op == 'U':
+            left, right = args
+            if right in (TRUE, FALSE) or left == FALSE or left == right:
+                return right
+            if left == TRUE:
+                return self.build('F', [right])
+        if op in ('<->', 'xnor') and args[0] == args[1]:
+            return TRUE
+        if op == 'xor' and args[0] == args[1]:
+            return FALSE
+        return ltl.Formula(op, *args)
+
+    def negate(self, operand):
+        """Returns the simplified negation of a simplified operand"""
+        if operand == TRUE:
+            return FALSE
+        if operand == FALSE:
+            return TRUE
+        if operand.op == '!':
+            return operand.args[0]
+        if operand.op in NEGATED_COMPARISON:
+            return ltl.Formula(NEGATED_COMPARISON[operand.op], *operand.args)
+        if operand.op in NEGATED_TEMPORAL:
+            negated = self.negate(operand.args[0])
+            # !G a is kept if !a does not simplify, F(!(a)) would only add parentheses
+            if negated.op != '!' or negated.args[0].is_leaf():
+                return self.build(NEGATED_TEMPORAL[operand.op], [negated])
+        return ltl.Not(operand)
+
+    def junction(self, op, args):
+        """Returns the simplified conjunction or disjunction of simplified args"""
+        unit, zero = (TRUE, FALSE) if op == '&' else (FALSE, TRUE)
+        dual = '|' if op == '&' else '&'
+
+        operands, seen = [], set()
+        for arg in args:
+            for operand in (arg.args if arg.op == op else (arg,)):
+                if operand == zero:
+                    return zero
+                if operand != unit and operand not in seen:
+                    seen.add(operand)
+                    operands.append(operand)
+
+        # complement: a & !a is FALSE, a | !a is TRUE
+        if any(operand.op == '!' and operand.args[0] in seen for operand in operands):
+            return zero
+
+        # absorption: a & (a | b) is a, a | (a & b) is a, and (a | b) & (a | b | c) is a | b
+        duals = [set(operand.args) for operand in operands if operand.op == dual]
+        operands = [operand for operand in operands
+                    if not (operand.op == dual and (any(other in seen for other in operand.args) or
+                                                    any(other < set(operand.args) for other in duals)))]
+
+        if op == '&':
+            operands = self.factor(operands)
+        return ltl.And(*operands) if op == '&' else ltl.Or(*operands)
+
+    def factor(self, operands):
+        """Merges the conjoined implications with the same antecedent, (a -> b) & (a -> c) is a -> (b & c)"""
+        consequents = {}
+        for operand in operands:
+            if operand.op == '->':
+                consequents.setdefault(operand.args[0], []).append(operand.args[1])
+        factored = []
+        for operand in operands:
+            if operand.op != '->':
+                factored.append(operand)
+            elif operand.args[0] in consequents:
+                antecedent = operand.args[0]
+                merged = consequents.pop(antecedent)
+                factored.append(operand if len(merged) == 1 else
+                                self.implication(antecedent, self.junction('&', merged)))
+        return factored
+
+    def implication(self, antecedent, consequent):
+        """Returns the simplified implication of two simplified formulas"""
+        if antecedent == FALSE or consequent == TRUE or antecedent == consequent:
+            return TRUE
+        if antecedent == TRUE:
+            return consequent
+        if consequent == FALSE:
+            return self.negate(antecedent)
+        # a -> (a -> b) is a -> b, as produced by saturating guarantees twice
+        while consequent.op == '->' and consequent.args[0] == antecedent:
+            consequent = consequent.args[1]
+        return ltl.Implies(antecedent, consequent)
+
+
+def simplify(formula):
+    """Returns the simplified form of formula"""
+    return Rewriter().simplify(formula)
+
+
+def simplify_all(formulas):
+    """Simplifies a list of formulas sharing one memo
+
+    Args:
+        formulas: a list of formula objects
+
+    Returns:
+        The list of the simplified formulas and the Reduction of their size
+    """
+    rewriter = Rewriter()
+    simplified = [rewriter.simplify(formula) for formula in formulas]
+    return simplified, Reduction(_nodes(formulas), _nodes(simplified), _chars(formulas), _chars(simplified))
+
+
+def _nodes(formulas):
+    """Returns the number of distinct nodes of a list of formulas"""
+    nodes = set()
+    for formula in formulas:
+        nodes.update(ltl.postorder(formula))
+    return len(nodes)
+
+
+def _chars(formulas):
+    """Returns the number of characters of the NuSMV text of a list of formulas"""
+    printer = ltl.Printer()
+    return sum(len(printer.text(formula)) for formula in formulas)
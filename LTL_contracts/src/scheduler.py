@@ -0,0 +1,130 @@
+"""Scheduler module runs a pipeline of checks and actions ordered by their dependencies, skipping everything that
+depends on a failed check and running the independent branches concurrently"""
+
+import os
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from LTL_contracts.src import core, memfile
+from LTL_contracts.src.check import Checks
+from LTL_contracts.src.contract import Contracts
+
+PASSED = 'passed'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+CANCELLED = 'cancelled'
+
+# outcome of a task: its status, the value it returned and the exception it raised, if any
+Outcome = namedtuple('Outcome', ['status', 'value', 'error'])
+
+
+class CheckScheduler(object):
+    """CheckScheduler stores the tasks of a pipeline and the dependencies among them
+
+    A task is either a check, passing when its result is True, or a callable, passing unless it returns False or
+    raises an exception. A task runs only after all its prerequisites passed.
+
+    Attributes:
+        tasks: an ordered dictionary mapping each task name to its (run, prerequisites) pair
+        workers: the maximum number of tasks running concurrently
+        fail_fast: a boolean, if True the first failure also cancels the independent tasks not started yet
+    """
+
+    def __init__(self, workers=None, fail_fast=False):
+        """Initialize an empty scheduler"""
+        self.tasks = OrderedDict()
+        self.workers = workers or os.cpu_count() or 1
+        self.fail_fast = fail_fast
+
+    def add_check(self, name, check, after=(), variables=None):
+        """Adds a check task
+
+        Args:
+            name: a string name for the task
+            check: a check object
+            after: names of the tasks that must pass before the check runs
+            variables: variables involved in the check, by default the alphabet of the check contracts, required for
+                the checks without contracts such as inclusions
+
+        Raises:
+            ValueError: if variables is not given and the check has no contracts
+        """
+        if variables is None:
+            if not hasattr(check, 'get_contracts'):
+                raise ValueError('the variables of check ' + name + ' are required, it has no contracts')
+            variables = Contracts(list(check.get_contracts())).get_alphabet()
+        self.add_action(name, lambda: _verify_isolated(variables, check), after)
+
+    def add_action(self, name, action, after=()):
+        """Adds a task running a callable with no arguments
+
+        Args:
+            name: a string name for the task
+            action: a callable, the task fails if it returns False or raises an exception
+            after: names of the tasks that must pass before the action runs
+        """
+        if name in self.tasks:
+            raise ValueError('task ' + name + ' already scheduled')
+        self.tasks[name] = (action, tuple(after))
+
+    def run(self):
+        """Runs all the tasks
+
+        Returns:
+            An ordered dictionary mapping each task name to its Outcome
+        """
+        for name, (_, after) in self.tasks.items():
+            for prerequisite in after:
+                if prerequisite not in self.tasks:
+                    raise ValueError('task ' + name + ' depends on unknown task ' + prerequisite)
+
+        outcomes = OrderedDict()
+        pending = list(self.tasks)
+        running = {}
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    statuses = [outcomes[p].status for p in self.tasks[name][1] if p in outcomes]
+                    if any(status != PASSED for status in statuses):
+                        outcomes[name] = Outcome(SKIPPED, None, None)
+                        pending.remove(name)
+                    elif len(statuses) == len(self.tasks[name][1]):
+                        running[executor.submit(self.tasks[name][0])] = name
+                        pending.remove(name)
+
+                if not running:
+                    if pending:
+                        raise ValueError('cyclic dependencies among tasks ' + ', '.join(pending))
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    outcomes[name] = _outcome(future)
+                    if outcomes[name].status == FAILED and self.fail_fast:
+                        for cancelled in pending:
+                            outcomes[cancelled] = Outcome(CANCELLED, None, None)
+                        pending = []
+
+        return OrderedDict((name, outcomes[name]) for name in self.tasks)
+
+
+def _outcome(future):
+    """Returns the Outcome of a completed task"""
+    error = future.exception()
+    if error is not None:
+        return Outcome(FAILED, None, error)
+    value = future.result()
+    return Outcome(FAILED if value is False else PASSED, value, None)
+
+
+def _verify_isolated(variables, check):
+    """Verifies a single check in a private in-memory model file, so that concurrent checks do not clobber each
+    other"""
+    checks = Checks()
+    checks.add_check(check)
+    smvfile = memfile.memory_file('checks')
+    try:
+        return core.verify(variables, checks, smvfile)[0]
+    finally:
+        memfile.remove(smvfile)
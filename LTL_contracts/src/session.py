@@ -0,0 +1,231 @@
+"""Session module keeps a pool of long-lived interactive NuSMV processes so that each check does not pay
+for a fresh process startup"""
+
+import subprocess, threading, queue, re, itertools, os
+
+NUSMV_INTERACTIVE = ['NuSMV', '-int']
+
+# seconds to wait for a session to answer before it is considered dead
+SESSION_TIMEOUT = 600
+PING_TIMEOUT = 10
+
+PROMPT = re.compile(r'^(NuSMV > )+')
+
+
+class SessionError(Exception):
+    """Raised when a session cannot load a model or stops answering"""
+    pass
+
+
+class SessionTimeout(SessionError):
+    """Raised when a session does not answer in time, the session has been killed"""
+    pass
+
+
+class Session(object):
+    """Session wraps one NuSMV process started in interactive mode
+
+    Attributes:
+        command: the command line used to start the process
+        process: the running NuSMV process
+        lines: a queue filled with the output lines by a reader thread
+        ordered: a boolean, True if the process has been given a BDD variable order file
+    """
+
+    _sentinels = itertools.count()
+
+    def __init__(self, command=None):
+        """Initialize and start a session"""
+        self.command = list(command or NUSMV_INTERACTIVE)
+        self.process = None
+        self.lines = None
+        self.start()
+
+    def start(self):
+        """Starts the NuSMV process and the thread reading its output"""
+        self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, encoding='UTF-8', bufsize=1)
+        self.lines = queue.Queue()
+        self.ordered = False
+        reader = threading.Thread(target=self._read, args=(self.process.stdout, self.lines))
+        reader.daemon = True
+        reader.start()
+
+    @staticmethod
+    def _read(stream, lines):
+        """Moves every output line of the process into the queue, None marks the end of the stream"""
+        for line in stream:
+            lines.put(PROMPT.sub('', line.rstrip('\n')))
+        lines.put(None)
+
+    def is_alive(self):
+        """Returns True if the process is running and answers a ping"""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            self._send([], PING_TIMEOUT)
+        except SessionError:
+            return False
+        return True
+
+    def restart(self):
+        """Kills the process, if any, and starts a new one"""
+        self.close()
+        self.start()
+
+    def kill(self):
+        """Kills the process at once, discarding the output it has not read yet"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process = None
+
+    def close(self):
+        """Terminates the process"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.write('quit\n')
+                self.process.stdin.flush()
+                self.process.wait(timeout=PING_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def check(self, smvfile, witnesses=True, ordfile=None):
+        """Loads the model in smvfile and checks all its LTL specifications
+
+        Args:
+            smvfile: a string name of the NuSMV file to check
+            witnesses: a boolean, if False counterexamples are not generated
+            ordfile: a string name of the BDD variable order file, None for the NuSMV default order
+
+        Returns:
+            A list of output lines, in the same format of a batch NuSMV run
+        """
+        commands = ['reset', 'read_model -i ' + os.path.abspath(smvfile)]
+        if ordfile is not None:
+            commands.append('set input_order_file ' + os.path.abspath(ordfile))
+        elif self.ordered:
+            commands.append('unset input_order_file')
+        self.ordered = ordfile is not None
+        commands.append('go')
+        diagnostics = self._send(commands, SESSION_TIMEOUT)
+        errors = [x for x in diagnostics if x and not (x[:3] == '***' or x[:7] == 'WARNING')]
+        if errors:
+            raise SessionError('\n'.join(errors))
+        return self._send(['set counter_examples ' + ('1' if witnesses else '0'), 'check_ltlspec'], SESSION_TIMEOUT)
+
+    def _send(self, commands, timeout):
+        """Sends the commands to the process and returns their output lines, up to an echoed sentinel"""
+        sentinel = '__cogomo_done_' + str(next(self._sentinels)) + '__'
+        try:
+            for command in commands + ['echo ' + sentinel]:
+                self.process.stdin.write(command + '\n')
+            self.process.stdin.flush()
+        except OSError as error:
+            raise SessionError(str(error))
+
+        output = []
+        while True:
+            try:
+                line = self.lines.get(timeout=timeout)
+            except queue.Empty:
+                # the rest of the output would be read as the answer to the next commands, so the process is killed
+                self.kill()
+                raise SessionTimeout('NuSMV did not answer within ' + str(timeout) + ' seconds')
+            if line is None:
+                raise SessionError('NuSMV terminated unexpectedly')
+            if line.endswith(sentinel):
+                return output
+            output.append(line)
+
+
+class SessionPool(object):
+    """SessionPool lends idle sessions to callers, checking their health and restarting the crashed ones
+
+    Attributes:
+        size: the maximum number of concurrent sessions
+        command: the command line used to start each session
+        idle: a queue of the sessions that are not in use
+    """
+
+    def __init__(self, size=1, command=None):
+        """Initialize a session pool, sessions are started lazily"""
+        self.size = size
+        self.command = command
+        self.idle = queue.LifoQueue()
+        self.sessions = []
+        self.lock = threading.Lock()
+
+    def _acquire(self):
+        """Returns an idle session, starting a new one if the pool is not full"""
+        with self.lock:
+            if self.idle.empty() and len(self.sessions) < self.size:
+                session = Session(self.command)
+                self.sessions.append(session)
+                return session
+        return self.idle.get()
+
+    def _release(self, session):
+        """Gives the session back to the pool"""
+        self.idle.put(session)
+
+    def check(self, smvfile, witnesses=True, ordfile=None):
+        """Checks the model in smvfile on a healthy session, retrying once on a fresh process if it crashes
+
+        A session that times out is replaced by a fresh process and the error is raised without retrying.
+
+        Args:
+            smvfile: a string name of the NuSMV file to check
+            witnesses: a boolean, if False counterexamples are not generated
+            ordfile: a string name of the BDD variable order file, None for the NuSMV default order
+
+        Returns:
+            A list of output lines, in the same format of a batch NuSMV run
+        """
+        session = self._acquire()
+        try:
+            if session.process is None or session.process.poll() is not None:
+                session.restart()
+            try:
+                return session.check(smvfile, witnesses, ordfile)
+            except SessionTimeout:
+                session.restart()
+                raise
+            except SessionError:
+                if session.is_alive():
+                    raise
+                session.restart()
+                return session.check(smvfile, witnesses, ordfile)
+        finally:
+            self._release(session)
+
+    def health(self):
+        """Pings every idle session and restarts the ones that do not answer
+
+        Returns:
+            The number of sessions that had to be restarted
+        """
+        restarted = 0
+        sessions = []
+        while not self.idle.empty():
+            sessions.append(self.idle.get())
+        for session in sessions:
+            if not session.is_alive():
+                session.restart()
+                restarted += 1
+            self.idle.put(session)
+        return restarted
+
+    def close(self):
+        """Terminates all the sessions of the pool"""
+        with self.lock:
+            for session in self.sessions:
+                session.close()
+            self.sessions = []
+            self.idle = queue.LifoQueue()
@@ -0,0 +1,142 @@
+"""Trace module stores NuSMV counterexamples column by column, decoding the states only when they are accessed"""
+
+import re
+from array import array
+from bisect import bisect_right
+
+STATE = re.compile(r'^\s*-> State: \S+ <-\s*$')
+INPUT = re.compile(r'^\s*-> Input: \S+ <-\s*$')
+LOOP = re.compile(r'^\s*-- Loop starts here\s*$')
+ASSIGNMENT = re.compile(r'^\s*(\S+)\s*=\s*(.*?)\s*$')
+
+
+class Trace(object):
+    """Trace is a columnar counterexample
+
+    NuSMV prints the full first state and then only the values that change, so each variable is stored as the
+    states where its value changes and the interned codes of the new values.
+
+    Attributes:
+        variables: a list of the variable names, in order of first appearance
+        changes: a dictionary mapping each variable to an array of the states where its value changes
+        codes: a dictionary mapping each variable to an array of the codes of its values at those states
+        values: a list of the distinct values, indexed by code
+        loop_starts: a list of the states where NuSMV marks that the loop starts
+        length: the number of states
+    """
+
+    __slots__ = ('variables', 'changes', 'codes', 'values', 'value_codes', 'loop_starts', 'length',
+                 '_loop_pending', '_in_input')
+
+    def __init__(self, lines=None):
+        """Initialize a trace, optionally parsing the lines of a NuSMV counterexample"""
+        self.variables = []
+        self.changes = {}
+        self.codes = {}
+        self.values = []
+        self.value_codes = {}
+        self.loop_starts = []
+        self.length = 0
+        self._loop_pending = False
+        self._in_input = False
+        for line in lines or []:
+            self.append(line)
+
+    def append(self, line):
+        """Parses the next line of a NuSMV counterexample"""
+        if LOOP.match(line):
+            self._loop_pending = True
+        elif STATE.match(line):
+            if self._loop_pending:
+                self.loop_starts.append(self.length)
+                self._loop_pending = False
+            self.length += 1
+            self._in_input = False
+        elif INPUT.match(line):
+            self._in_input = True
+        elif self.length > 0 and not self._in_input:
+            match = ASSIGNMENT.match(line)
+            if match:
+                self._assign(match.group(1), match.group(2))
+
+    def _assign(self, var, value):
+        """Records that var takes value in the last state"""
+        code = self.value_codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.value_codes[value] = code
+        if var not in self.changes:
+            self.variables.append(var)
+            self.changes[var] = array('l')
+            self.codes[var] = array('l')
+        state = self.length - 1
+        if len(self.changes[var]) and self.changes[var][-1] == state:
+            self.codes[var][-1] = code
+        else:
+            self.changes[var].append(state)
+            self.codes[var].append(code)
+
+    def value(self, var, state):
+        """Returns the value of var in state, None if it has not been printed yet"""
+        if state < 0:
+            state += self.length
+        if not 0 <= state < self.length:
+            raise IndexError('state ' + str(state) + ' out of a trace of length ' + str(self.length))
+        position = bisect_right(self.changes[var], state) - 1
+        return self.values[self.codes[var][position]] if position >= 0 else None
+
+    def column(self, var):
+        """Returns the list of the values of var in all the states"""
+        column = []
+        changes, codes = self.changes[var], self.codes[var]
+        position = -1
+        for state in range(self.length):
+            while position + 1 < len(changes) and changes[position + 1] <= state:
+                position += 1
+            column.append(self.values[codes[position]] if position >= 0 else None)
+        return column
+
+    def __getitem__(self, state):
+        """Decodes state into a dictionary mapping each variable to its value"""
+        return dict((var, self.value(var, state)) for var in self.variables)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for state in range(self.length):
+            yield self[state]
+
+    def to_npz(self, npzfile):
+        """Exports the trace to a NumPy .npz file
+
+        The file holds a states x variables matrix of value codes, the variable names, the value table and the loop
+        starts. Codes of values not printed yet are -1.
+
+        Args:
+            npzfile: a string name of the .npz file
+        """
+        import numpy
+        matrix = numpy.full((self.length, len(self.variables)), -1, dtype=numpy.int32)
+        for column, var in enumerate(self.variables):
+            changes = list(self.changes[var]) + [self.length]
+            for i, code in enumerate(self.codes[var]):
+                matrix[changes[i]:changes[i + 1], column] = code
+        numpy.savez_compressed(npzfile, codes=matrix, variables=numpy.array(self.variables),
+                               values=numpy.array(self.values), loop_starts=numpy.array(self.loop_starts, dtype=int))
+
+    def __str__(self):
+        """Override the print behavior, printing only the changed values like NuSMV does"""
+        lines = []
+        positions = dict((var, 0) for var in self.variables)
+        for state in range(self.length):
+            if state in self.loop_starts:
+                lines.append('  -- Loop starts here')
+            lines.append('  -> State: 1.' + str(state + 1) + ' <-')
+            for var in self.variables:
+                position = positions[var]
+                if position < len(self.changes[var]) and self.changes[var][position] == state:
+                    lines.append('    ' + var + ' = ' + self.values[self.codes[var][position]])
+                    positions[var] += 1
+        return '\n'.join(lines)
@@ -3,6 +3,8 @@ from src.context import *
 
 sys.path.append(os.path.join(os.getcwd(), os.path.pardir))
 
+from LTL_contracts.src.memfile import memory_file
+
 
 
 class Incompatible(Exception):
@@ -60,7 +62,7 @@ def check_compatibility_consistency(list_contracts):
 
 
 if __name__ == "__main__":
-    smv_file = "test_smvfile.smv"
+    smv_file = memory_file("test_smvfile")
 
     robot_1 = Robot("robot_1", "M")
     robot_1.add_assumption("G(N)")
@@ -0,0 +1,7 @@
+"""Puts the repository root, LTL_contracts and its sources on the import path, as the scripts of LTL_contracts expect"""
+
+import os, sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, os.path.pardir, os.path.pardir), os.path.join(HERE, os.path.pardir),
+                os.path.join(HERE, os.path.pardir, 'src')]
@@ -0,0 +1,47 @@
+"""Tests of the bounded model checker, its verdicts and the counterexamples it returns"""
+
+import pytest
+
+from LTL_contracts.src import bmc
+from LTL_contracts.src.formula import parse
+
+BOOLEANS = [('p', 'boolean'), ('q', 'boolean')]
+
+
+def test_propositional_verdicts():
+    assert bmc.holds(BOOLEANS, parse('p & q -> p')) is True
+    assert bmc.holds(BOOLEANS, parse('p | q -> p')) is False
+
+
+def test_holding_temporal_specification_is_inconclusive():
+    with pytest.raises(bmc.Inconclusive):
+        bmc.holds(BOOLEANS, parse('G(p) -> F(p)'))
+
+
+def test_refuted_temporal_specification():
+    assert bmc.holds(BOOLEANS, parse('F(p) -> G(p)')) is False
+
+
+def test_counterexample_is_a_shortest_lasso():
+    trace = bmc.counterexample(BOOLEANS, parse('G(p) | G(!p)'))
+    assert len(trace) == 2
+    assert {trace.value('p', 0), trace.value('p', 1)} == {'TRUE', 'FALSE'}
+    trace = bmc.counterexample(BOOLEANS, parse('F(p)'))
+    assert len(trace) == 1 and trace.loop_starts == [0] and trace.value('p', 0) == 'FALSE'
+
+
+def test_no_counterexample_within_the_bound():
+    formula = parse('!(!p & X(!p) & X(X(!p)) & X(X(X(p))))')
+    assert bmc.counterexample(BOOLEANS, formula, 2) is None
+    assert len(bmc.counterexample(BOOLEANS, formula, 3)) == 4
+
+
+def test_ranged_enumerated_and_real_variables():
+    weight = [('weight_power', '5..15')]
+    trace = bmc.counterexample(weight, parse('G(weight_power > 5)'))
+    assert trace.value('weight_power', -1) == '5'
+    with pytest.raises(bmc.Inconclusive):
+        bmc.holds(weight, parse('G(weight_power > 4 & weight_power < 16)'))
+    trace = bmc.counterexample([('mode', '{idle, busy}')], parse('G(mode = idle)'))
+    assert 'busy' in trace.column('mode')
+    assert bmc.holds([('r', 'real')], parse('G(r > 0) -> F(r > 1)')) is False
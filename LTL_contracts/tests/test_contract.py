@@ -0,0 +1,38 @@
+"""Tests of the equality, hashing and pickling of contracts"""
+
+import pickle
+
+from LTL_contracts.src.contract import Contract
+from LTL_contracts.src.patterns import OrderedVisit
+
+
+def contract(name, guarantee):
+    contract = Contract()
+    contract.name = name
+    contract.add_variables([('p', 'boolean'), ('q', 'boolean')])
+    contract.add_guarantee(guarantee)
+    return contract
+
+
+def test_equal_contracts_are_the_same_key():
+    a, b = contract('c', 'G(p)'), contract('c', 'G(p)')
+    assert a == b and hash(a) == hash(b)
+    assert b in {a}
+
+
+def test_fingerprint_follows_changes():
+    a, b = contract('c', 'G(p)'), contract('c', 'G(p)')
+    fingerprint = a.fingerprint()
+    a.add_guarantee('F(q)')
+    assert a.fingerprint() != fingerprint and a != b
+    b.add_guarantee('F(q)')
+    assert a == b and hash(a) == hash(b)
+
+
+def test_subclass_slots_are_compared_and_pickled():
+    visit = OrderedVisit('visit', ['a', 'b'])
+    assert not hasattr(visit, '__dict__')
+    restored = pickle.loads(pickle.dumps(visit))
+    assert restored == visit and restored.locations == ['a', 'b']
+    restored.locations = ['b', 'a']
+    assert restored != visit
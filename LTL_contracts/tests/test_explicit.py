@@ -0,0 +1,68 @@
+"""Tests of the explicit-state engine against known verdicts and against the other in-process engines"""
+
+import os
+import pytest
+
+from LTL_contracts.diff_explicit import CORPUS, read_model
+from LTL_contracts.src import bmc, explicit, operations, propositional
+from LTL_contracts.src.formula import And, Atom, Globally, parse
+from LTL_contracts.src.patterns import DelayedReaction, OrderedVisit
+from LTL_contracts.src.propositional import Unsupported
+
+BOOLEANS = [('p', 'boolean'), ('q', 'boolean')]
+INTEGERS = [('x', '0..5'), ('p', 'boolean')]
+
+
+@pytest.mark.parametrize('variables, spec, expected', [
+    (BOOLEANS, 'G(p) -> F(p)', True),
+    (BOOLEANS, 'F(p) -> G(p)', False),
+    (BOOLEANS, 'G(p -> X(q)) & G(p) -> G(F(q))', True),
+    (BOOLEANS, 'p U q -> F(q)', True),
+    (BOOLEANS, 'F(q) -> p U q', False),
+    (BOOLEANS, 'G(F(p)) -> F(G(p))', False),
+    (BOOLEANS, 'F(G(p)) -> G(F(p))', True),
+    (BOOLEANS, 'X(p) <-> !X(!p)', True),
+    (INTEGERS, 'G(x > 3) -> G(x >= 4)', True),
+    (INTEGERS, 'G(x < 0 | x > 5) -> FALSE', True),
+    (INTEGERS, 'F(x + 1 = 7)', False),
+    (INTEGERS, 'G(p -> x = 2) & F(p) -> F(x = 2)', True),
+])
+def test_known_verdicts(variables, spec, expected):
+    assert explicit.holds(variables, parse(spec)) is expected
+
+
+def test_automata_are_cached():
+    formula = parse('G(p -> F(q))')
+    assert explicit.automaton(formula) is explicit.automaton(formula)
+
+
+def test_too_many_propositions():
+    variables = [('p' + str(i), 'boolean') for i in range(explicit.MAX_PROPOSITIONS + 1)]
+    formula = And(*[Globally(Atom(name)) for name, _ in variables])
+    with pytest.raises(Unsupported):
+        explicit.holds(variables, formula)
+
+
+def test_patterns():
+    visit = OrderedVisit('visit', ['a', 'b'])
+    reaction = DelayedReaction('reaction', 'b', 'c')
+    composite = operations.composition([visit, reaction])
+    variables = composite.get_variables()
+    assert explicit.holds(variables, operations.compatibility(composite)) is False
+    assert explicit.holds(variables, operations.consistency(composite)) is False
+    reaction.add_guarantee('G(!c)')
+    assert explicit.holds(variables, operations.consistency(operations.composition([visit, reaction]))) is True
+
+
+@pytest.mark.parametrize('name', sorted(os.listdir(CORPUS)))
+def test_agrees_with_the_other_engines_on_the_corpus(name):
+    variables, specs = read_model(os.path.join(CORPUS, name))
+    for spec in specs:
+        try:
+            verdict = explicit.holds(variables, spec)
+        except Unsupported:
+            continue
+        if propositional.is_propositional(spec):
+            assert verdict is propositional.holds(variables, spec), str(spec)
+        if bmc.counterexample(variables, spec, 3) is not None:
+            assert verdict is False, str(spec)
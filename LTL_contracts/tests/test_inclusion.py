@@ -0,0 +1,47 @@
+"""Tests of the index of proven inclusions and of its use by core.check_inclusions"""
+
+from LTL_contracts.src import core
+from LTL_contracts.src.formula import parse
+from LTL_contracts.src.inclusion import InclusionIndex
+
+VARIABLES = [('p', 'boolean'), ('q', 'boolean'), ('r', 'boolean')]
+
+
+def test_proven_inclusions_are_chained():
+    index = InclusionIndex()
+    index.record(VARIABLES, parse('p'), parse('q'), True)
+    index.record(VARIABLES, parse('q'), parse('r'), True)
+    assert index.lookup(VARIABLES, parse('p'), parse('r')) is True
+    assert index.lookup(VARIABLES, parse('p & q'), parse('r')) is True
+    assert index.lookup(VARIABLES, parse('r'), parse('p')) is None
+
+
+def test_refuted_inclusion_refutes_weaker_premises():
+    index = InclusionIndex()
+    index.record(VARIABLES, parse('p'), parse('q'), False)
+    assert index.lookup(VARIABLES, parse('p | r'), parse('q')) is False
+    assert index.lookup(VARIABLES, parse('p'), parse('q & r')) is False
+
+
+def test_facts_are_not_used_with_other_types():
+    index = InclusionIndex()
+    index.record(VARIABLES, parse('p'), parse('q'), True)
+    assert index.lookup([('p', 'boolean'), ('q', '0..1')], parse('p'), parse('q')) is None
+
+
+def test_undecided_inclusion_is_not_recorded(monkeypatch):
+    index = InclusionIndex()
+    monkeypatch.setattr(core, 'inclusion_index', index)
+    monkeypatch.setattr(core, 'verify', lambda variables, checks, **options: [None] * len(checks.checks))
+    assert core.check_inclusions(VARIABLES, [('p', 'q')]) == [None]
+    assert index.refuted == {} and index.successors == {}
+    assert index.lookup(VARIABLES, parse('p'), parse('q')) is None
+
+
+def test_decided_inclusions_are_recorded(monkeypatch):
+    index = InclusionIndex()
+    monkeypatch.setattr(core, 'inclusion_index', index)
+    monkeypatch.setattr(core, 'verify', lambda variables, checks, **options: [True, False])
+    assert core.check_inclusions(VARIABLES, [('p', 'q'), ('q', 'p')]) == [True, False]
+    assert index.lookup(VARIABLES, parse('p'), parse('q')) is True
+    assert index.lookup(VARIABLES, parse('q'), parse('p')) is False
@@ -0,0 +1,61 @@
+"""Tests of the in-process decision and the range tightening of the interval fast path"""
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from LTL_contracts.src import explicit, intervals
+from LTL_contracts.src.formula import parse
+from LTL_contracts.src.propositional import Unsupported
+
+X = [('x', '0..20')]
+WEIGHT = [('weight_power', '5..15')]
+
+
+@pytest.mark.parametrize('variables, spec, expected', [
+    (X, 'x > 9 -> x > 8', True),
+    (X, 'x > 8 -> x > 9', False),
+    (X, '(x < 13 & x > 7) -> x < 13', True),
+    (X, 'G(x > 9) -> G(x > 8)', True),
+    (X, 'F(x > 9) -> G(x > 8)', False),
+    (WEIGHT, 'G(weight_power > 10) -> G(weight_power > 5 & weight_power < 16)', True),
+    (WEIGHT, '!(G(weight_power > 10) & G(weight_power > 5 & weight_power < 10))', True),
+    (WEIGHT, '!(F(weight_power > 10) & G(weight_power > 5))', False),
+    (X, 'x > 25', False),
+    (X, 'x < 25', True),
+    (X, 'G(x > -5)', True),
+    (X, '!F(x > 25)', True),
+])
+def test_holds(variables, spec, expected):
+    assert intervals.holds(variables, parse(spec)) is expected
+    assert explicit.holds(variables, parse(spec)) is expected
+
+
+@pytest.mark.parametrize('spec', ['X(x > 3)', 'G(F(x > 3))', 'x > 3 U x > 5'])
+def test_outside_the_fragment(spec):
+    with pytest.raises(Unsupported):
+        intervals.holds(X, parse(spec))
+
+
+def test_tighten_cuts_one_past_the_constants():
+    specs = [parse('x > 9 -> x > 8')]
+    assert intervals.tighten(X, specs) == [('x', '7..10')]
+    specs = [parse('G(weight_power > 10) -> G(weight_power > 5 & weight_power < 10)')]
+    assert intervals.tighten(WEIGHT, specs) == [('weight_power', '5..11')]
+
+
+def test_tighten_constants_outside_the_range():
+    assert intervals.tighten(X, [parse('x > 25')]) == [('x', '20..20')]
+    assert intervals.tighten(X, [parse('x < -5')]) == [('x', '0..0')]
+    assert intervals.tighten(X, [parse('x < -5 | x > 25')]) == [('x', '0..20')]
+
+
+def test_tighten_keeps_variables_in_arithmetic():
+    variables = [('x', '0..20'), ('y', '0..20'), ('z', '0..20')]
+    specs = [parse('x + y > 3'), parse('y < 2 & z < 2')]
+    assert intervals.tighten(variables, specs) == [('x', '0..20'), ('y', '0..20'), ('z', '1..3')]
+
+
+@pytest.mark.parametrize('spec', ['x > 9 -> x > 8', 'G(x > 9) -> F(x < 3)', 'x > 25', 'x < -5 | G(x = 4)'])
+def test_tighten_keeps_the_verdicts(spec):
+    assert intervals.holds(intervals.tighten(X, [parse(spec)]), parse(spec)) is intervals.holds(X, parse(spec))
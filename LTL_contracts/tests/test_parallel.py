@@ -0,0 +1,31 @@
+"""Tests of the sharded parallel runs"""
+
+from LTL_contracts.src import core
+from LTL_contracts.src.parallel import run_parallel
+from LTL_contracts.src.cache import VerdictCache
+from LTL_contracts.src.check import Checks, Inclusion
+
+VARIABLES = [('x', '0..5'), ('p', 'boolean'), ('q', 'boolean')]
+
+
+def inclusions():
+    checks = Checks()
+    for i in range(6):
+        checks.add_check(Inclusion('G(x > ' + str(i) + ')', 'F(p | x >= ' + str(i) + ')'))
+        checks.add_check(Inclusion('F(x = ' + str(i) + ')', 'G(q)'))
+        checks.add_check(Inclusion('p & x > ' + str(i), 'x >= ' + str(i)))
+    return checks
+
+
+def test_parallel_run_agrees_with_verify():
+    assert run_parallel(VARIABLES, inclusions(), processes=2) == core.verify(VARIABLES, inclusions(), cache=False)
+
+
+def test_parallel_run_uses_the_verdict_cache(monkeypatch, tmp_path):
+    cache = VerdictCache(str(tmp_path / 'verdicts.db'))
+    monkeypatch.setattr(core, 'verdict_cache', cache)
+    results = run_parallel(VARIABLES, inclusions(), processes=2)
+    assert cache.stores == len(results)
+    assert run_parallel(VARIABLES, inclusions(), processes=2) == results
+    assert cache.hits == len(results)
+    cache.close()
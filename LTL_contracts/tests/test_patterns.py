@@ -0,0 +1,47 @@
+"""Tests of the location encodings of the patterns"""
+
+import pytest
+
+from LTL_contracts.src import explicit, operations
+from LTL_contracts.src.contract import Contracts
+from LTL_contracts.src.patterns import GlobalAvoidance, OrderedVisit, SequencedVisit, Visit
+
+
+def missions(encoding):
+    """Returns composed missions whose patterns share locations"""
+    return [
+        [OrderedVisit('visit', ['a', 'b'], encoding=encoding), GlobalAvoidance('avoid', ['b'], encoding=encoding)],
+        [OrderedVisit('visit', ['a', 'b'], encoding=encoding), GlobalAvoidance('avoid', ['c'], encoding=encoding)],
+        [Visit('visit', ['a', 'b'], encoding=encoding), SequencedVisit('sequence', ['b', 'c'], encoding=encoding)],
+        [Visit('visit', ['a'], encoding=encoding), GlobalAvoidance('avoid', ['c', 'a'], encoding=encoding)],
+    ]
+
+
+def verdicts(encoding):
+    """Returns the compatibility and consistency verdicts of the missions"""
+    results = []
+    for mission in missions(encoding):
+        for pattern in mission:
+            if hasattr(pattern, 'add_physical_assumptions'):
+                pattern.add_physical_assumptions()
+        variables = Contracts(mission).get_alphabet()
+        composite = operations.composition(mission)
+        results.append((explicit.holds(variables, operations.compatibility(composite)),
+                        explicit.holds(variables, operations.consistency(composite))))
+    return results
+
+
+def test_encodings_give_the_same_verdicts():
+    assert verdicts('enum') == verdicts('boolean')
+    # the consistency specification holds when the composition is inconsistent
+    assert [inconsistent for _, inconsistent in verdicts('enum')] == [True, False, False, True]
+
+
+@pytest.mark.parametrize('encoding', ['boolean', 'enum'])
+def test_location_is_shared_by_the_patterns(encoding):
+    mission = missions(encoding)[0]
+    variables = Contracts(mission).get_alphabet()
+    if encoding == 'enum':
+        assert variables == [('loc_', '{at__none, at_a, at_b}')]
+    else:
+        assert variables == [('a', 'boolean'), ('b', 'boolean')]
@@ -0,0 +1,67 @@
+"""Tests of the rewrite pass: each rule, the equivalence of the simplified formulas and the size reduction"""
+
+import pytest
+
+from LTL_contracts.bench_rewrite import mission, specs
+from LTL_contracts.src import explicit, rewrite
+from LTL_contracts.src import formula as ltl
+from LTL_contracts.src.formula import parse
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('p & TRUE', 'p'),
+    ('p | TRUE', 'TRUE'),
+    ('p & FALSE', 'FALSE'),
+    ('TRUE -> p', 'p'),
+    ('FALSE -> p', 'TRUE'),
+    ('G(TRUE)', 'TRUE'),
+    ('F(FALSE)', 'FALSE'),
+    ('(p & q) & r', 'p & q & r'),
+    ('p & p & q', 'p & q'),
+    ('p & !p', 'FALSE'),
+    ('p | (p & q)', 'p'),
+    ('p & (p | q)', 'p'),
+    ('!!p', 'p'),
+    ('X(!(!p))', 'X(p)'),
+    ('!G(p)', 'F(!p)'),
+    ('!F(x > 3)', 'G(x <= 3)'),
+    ('!(x < 3)', 'x >= 3'),
+    ('(a -> g1) & (a -> g2)', 'a -> g1 & g2'),
+    ('a -> (a -> g)', 'a -> g'),
+])
+def test_rules(text, expected):
+    assert str(rewrite.simplify(parse(text))) == expected
+
+
+EQUIVALENCES = ['!(G(p -> F(q)) & !(p U q))', '(a -> G(p)) & (a -> F(q)) & (a -> G(p))', '!(X(p) | !G(q & TRUE))',
+                'F(p) | (F(p) & q) | !!r', '!(x > 2 & !(x <= 1)) -> G(x != 3)']
+
+
+@pytest.mark.parametrize('text', EQUIVALENCES)
+def test_simplified_formula_is_equivalent(text):
+    variables = [('p', 'boolean'), ('q', 'boolean'), ('r', 'boolean'), ('a', 'boolean'), ('x', '0..5')]
+    formula = parse(text)
+    assert explicit.holds(variables, ltl.lift('(' + str(formula) + ') <-> (' + str(rewrite.simplify(formula)) + ')'))
+
+
+def test_mission_specifications_are_not_longer():
+    printer = ltl.Printer()
+    for formula in specs(mission(10)):
+        assert len(printer.text(rewrite.simplify(formula))) <= len(printer.text(formula))
+
+
+def test_mission_specifications_are_equivalent():
+    contracts = mission(2)
+    variables = []
+    for contract in contracts:
+        variables += [variable for variable in contract.variables if variable not in variables]
+    for formula in specs(contracts):
+        assert explicit.holds(variables, ltl.Compare('<->', formula, rewrite.simplify(formula)))
+
+
+def test_reduction_report():
+    formulas = specs(mission(10))
+    simplified, reduction = rewrite.simplify_all(formulas)
+    assert simplified == [rewrite.simplify(formula) for formula in formulas]
+    assert reduction.chars_after < reduction.chars_before
+    assert reduction.nodes_before == rewrite._nodes(formulas) and reduction.nodes_after == rewrite._nodes(simplified)
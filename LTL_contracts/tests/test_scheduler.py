@@ -0,0 +1,39 @@
+"""Tests of the check scheduler and of the caches shared by its worker threads"""
+
+import pytest
+
+from LTL_contracts.src import explicit
+from LTL_contracts.src.scheduler import CheckScheduler, PASSED, FAILED
+from LTL_contracts.src.check import Inclusion
+
+VARIABLES = [('p', 'boolean'), ('q', 'boolean')]
+
+
+def test_inclusion_check_requires_variables():
+    scheduler = CheckScheduler(workers=2)
+    with pytest.raises(ValueError):
+        scheduler.add_check('inclusion', Inclusion('p & q', 'p'))
+
+
+def test_inclusion_checks_run_with_their_variables():
+    scheduler = CheckScheduler(workers=2)
+    scheduler.add_check('holds', Inclusion('p & q', 'p'), variables=VARIABLES)
+    scheduler.add_check('fails', Inclusion('p', 'p & q'), variables=VARIABLES)
+    outcomes = scheduler.run()
+    assert outcomes['holds'].status == PASSED and outcomes['fails'].status == FAILED
+
+
+def test_concurrent_in_process_checks(monkeypatch):
+    monkeypatch.setattr(explicit, 'AUTOMATON_CACHE_SIZE', 2)
+    variables = [('x', '0..5')] + VARIABLES
+    scheduler = CheckScheduler(workers=8)
+    expected = {}
+    for i in range(24):
+        holds = i % 2 == 0
+        bound = str(i % 6)
+        check = Inclusion('G(x > ' + bound + ')', 'F(p | x >= ' + bound + ')') if holds else \
+            Inclusion('F(x = ' + bound + ')', 'G(q)')
+        scheduler.add_check('check_' + str(i), check, variables=variables)
+        expected['check_' + str(i)] = PASSED if holds else FAILED
+    outcomes = scheduler.run()
+    assert dict((name, outcome.status) for name, outcome in outcomes.items()) == expected
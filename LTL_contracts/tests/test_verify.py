@@ -0,0 +1,26 @@
+"""Tests of verify around the verdict cache"""
+
+from LTL_contracts.src import core
+from LTL_contracts.src.cache import VerdictCache
+from LTL_contracts.src.check import Checks, Inclusion
+from LTL_contracts.src.formula import parse
+
+VARIABLES = [('p', 'boolean'), ('q', 'boolean')]
+
+
+def inclusions(*pairs):
+    checks = Checks()
+    for aproposition, bproposition in pairs:
+        checks.add_check(Inclusion(parse(aproposition), parse(bproposition)))
+    return checks
+
+
+def test_results_after_an_undecided_check_are_kept_and_cached(monkeypatch, tmp_path):
+    cache = VerdictCache(str(tmp_path / 'verdicts.db'))
+    monkeypatch.setattr(core, 'verdict_cache', cache)
+    monkeypatch.setattr(core, '_decide', lambda variables, checks, *options: [None, False, True])
+    checks = inclusions(('p', 'q'), ('q', 'p'), ('p & q', 'p'))
+    assert core.verify(VARIABLES, checks) == [None, False, True]
+    keys = [cache.key(VARIABLES, check) for check in checks.checks]
+    assert [cache.get(key) for key in keys] == [None, False, True]
+    cache.close()
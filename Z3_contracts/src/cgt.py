@@ -15,6 +15,9 @@ class Cgt(Contract):
         contracts: a list of contract objects
         alphabet: a list of tuples containing the shared alphabet among all contracts
     """
+
+    __slots__ = ('description', 'contracts', 'sub_goals', 'sub_operation', 'parent_goal', 'parent_operation')
+
     def __init__(self,
                  name="no_name",
                  description="",
@@ -86,7 +89,7 @@ class Cgt(Contract):
     def __eq__(self, other):
         """Override the default Equals behavior"""
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self.key() == other.key() and self._extra() == other._extra()
         return False
 
     def __ne__(self, other):
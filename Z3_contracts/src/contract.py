@@ -3,19 +3,50 @@
 to store all system contracts and overall system alphabet"""
 
 from collections import OrderedDict
+from types import MappingProxyType
 from z3 import *
 
 
+def _handle(value):
+    """Returns the interned handle of a Z3 expression, the unique id Z3 gives to each distinct term, or the value
+    itself for constants"""
+    return value.get_id() if is_ast(value) else value
+
+
+def _field(slot, doc):
+    """Returns a property keeping a list of Z3 expressions as a tuple in slot, discarding the cached key when it
+    is set"""
+    def get(self):
+        return getattr(self, slot)
+
+    def set(self, values):
+        setattr(self, slot, tuple(values))
+        self._key = None
+    return property(get, set, doc=doc)
+
+
 class Contract(object):
     """Contract class stores data attributes of a contract
 
+    The assumptions and guarantees are tuples of Z3 expressions, which Z3 hash-conses, so the contract is identified
+    by its name and the ids of its terms. This key and its fingerprint are computed once and kept until an attribute
+    changes, so unequal contracts are told apart in constant time. The variables are a read-only view, they are
+    changed with the variables setter, add_variable or add_constant. Contracts hash by their fingerprint,
+    consistently with equality, so equal contracts are the same key; a contract must not be changed while it is in a
+    set or a dictionary.
+
     Attributes:
         name: a string name for the contract
         variables: a dictionary containing the string of the variable as key, and the Z3 variable as value
-        assumptions: a list of Z3 relations assumed by contract
-        guarantees: a list of Z3 relations relations guaranteed by contract
+        assumptions: a tuple of Z3 relations assumed by contract
+        guarantees: a tuple of Z3 relations relations guaranteed by contract
     """
 
+    __slots__ = ('_name', '_variables', '_assumptions', '_guarantees', '_key', '_fingerprint')
+
+    assumptions = _field('_assumptions', 'a tuple of Z3 relations assumed by contract')
+    guarantees = _field('_guarantees', 'a tuple of Z3 relations guaranteed by contract')
+
     def __init__(self,
                  name='',
                  variables=None,
@@ -26,12 +57,12 @@ class Contract(object):
         self.name = name
 
         if guarantees is None:
-            self.guarantees = []
+            self.guarantees = ()
         else:
             self.guarantees = guarantees
 
         if assumptions is None:
-            self.assumptions = []
+            self.assumptions = ()
         else:
             self.assumptions = assumptions
 
@@ -40,6 +71,26 @@ class Contract(object):
         else:
             self.variables = variables
 
+    @property
+    def name(self):
+        """a string name for the contract"""
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        self._key = None
+
+    @property
+    def variables(self):
+        """a read-only dictionary containing the string of the variable as key, and the Z3 variable as value"""
+        return MappingProxyType(self._variables)
+
+    @variables.setter
+    def variables(self, variables):
+        self._variables = dict(variables)
+        self._key = None
+
     def set_name(self, name):
         """Assigns the contract a name
 
@@ -59,9 +110,10 @@ class Contract(object):
         """
         name, var_type = variable
         if var_type == 'REAL':
-            self.variables[name] = Real(name)
+            self._variables[name] = Real(name)
         elif var_type == 'BOOL':
-            self.variables[name] = Bool(name)
+            self._variables[name] = Bool(name)
+        self._key = None
 
     def add_variables(self, variables):
         """Adds a list of variables to the contract variables
@@ -80,7 +132,8 @@ class Contract(object):
         :param constant: a tuple containing the constant name and the value (int)
         """
         name, value = constant
-        self.variables[name] = int(value)
+        self._variables[name] = int(value)
+        self._key = None
 
     def add_assumption(self, assumption):
         """Adds an assumption to the contract assumptions
@@ -88,7 +141,7 @@ class Contract(object):
         Args:
             assumption: Z3 proposition where the variables are contained in self.variables
         """
-        self.assumptions.append(eval(assumption))
+        self.assumptions = self._assumptions + (eval(assumption),)
 
     def add_guarantee(self, guarantee):
         """Adds a guarantee to the contract guarantees
@@ -96,16 +149,16 @@ class Contract(object):
         Args:
             guarantee: Z3 proposition where the variables are contained in self.variables
         """
-        self.guarantees.append(eval(guarantee))
+        self.guarantees = self._guarantees + (eval(guarantee),)
 
 
     def get_assumptions(self):
 
-        return self.assumptions
+        return list(self._assumptions)
 
     def get_guarantees(self):
 
-        return self.guarantees
+        return list(self._guarantees)
 
     def is_full(self):
         """
@@ -147,10 +200,37 @@ class Contract(object):
             astr += str(guarantee) + ', '
         return astr[:-2] + ' ]\n]'
 
+    def key(self):
+        """Returns the name of the contract and the handles of its variables, assumptions and guarantees"""
+        if self._key is None:
+            self._key = (self._name,
+                         tuple((name, _handle(value)) for name, value in self._variables.items()),
+                         tuple(_handle(assumption) for assumption in self._assumptions),
+                         tuple(_handle(guarantee) for guarantee in self._guarantees))
+            self._fingerprint = hash(self._key)
+        return self._key
+
+    def fingerprint(self):
+        """Returns the structural hash of the contract, computed once and changed whenever the contract changes"""
+        self.key()
+        return self._fingerprint
+
+    def __hash__(self):
+        """Returns the fingerprint of the contract, equal contracts have the same one"""
+        return self.fingerprint()
+
+    def _extra(self):
+        """Returns the dictionary of the attributes declared in the slots of the subclasses"""
+        return {slot: getattr(self, slot, None) for cls in type(self).__mro__ if cls is not Contract
+                for slot in cls.__dict__.get('__slots__', ())}
+
     def __eq__(self, other):
         """Override the default Equals behavior"""
+        if self is other:
+            return True
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return (self.fingerprint() == other.fingerprint() and self.key() == other.key()
+                    and self._extra() == other._extra())
         return False
 
     def __ne__(self, other):
@@ -161,6 +241,8 @@ class Contract(object):
 
 class Goal(Contract):
 
+    __slots__ = ('description',)
+
     def __init__(self, description=""):
         super().__init__()
         self.description = description
@@ -172,18 +254,31 @@ class Goal(Contract):
         return self.description
 
 
+def _compatible(value, other):
+    """Returns True if two declarations of a name agree: Z3 variables of the same sort or equal constants"""
+    if is_ast(value) and is_ast(other):
+        return value.sort() == other.sort()
+    return type(value) is type(other) and value == other
+
+
 class Contracts(object):
     """Contracts class stores all contracts for a system and the shared alphabet
 
     Attributes:
         contracts: a list of contract objects
-        alphabet: a list of tuples containing the shared alphabet among all contracts
+        alphabet: a list of the variable names shared among all contracts, in order of first occurrence
+        users: an ordered dictionary mapping each variable name to the Z3 variable and the names of the contracts
+            declaring it
+        conflicts: a list of (name, contract name) pairs of the variables declared with a different sort than the
+            first declaration, or of the constants declared with a different value
     """
 
     def __init__(self):
         """Initialize a contracts object"""
         self.contracts = OrderedDict()
         self.alphabet = []
+        self.users = OrderedDict()
+        self.conflicts = []
 
     def add_contract(self, contract):
         """Add a contract to the contracts object and update the alphabet
@@ -192,7 +287,24 @@ class Contracts(object):
             contract: a contract object
         """
         self.contracts[contract.name] = contract
-        self.alphabet = list(set(self.alphabet) | set(contract.variables))
+        for name, var in contract.variables.items():
+            if name not in self.users:
+                self.users[name] = (var, [])
+                self.alphabet.append(name)
+            elif not _compatible(self.users[name][0], var):
+                self.conflicts.append((name, contract.name))
+            self.users[name][1].append(contract.name)
+
+    def get_users(self, name):
+        """Get the contracts declaring a variable
+
+        Args:
+            name: a string variable name
+
+        Returns:
+            A list of contract objects
+        """
+        return [self.contracts[user] for user in self.users[name][1]] if name in self.users else []
 
     def get_contract(self, name):
         """Get the contract with the specified name
@@ -29,7 +29,7 @@ def compose_contracts(contracts, abstract_on_guarantees=None):
         raise WrongParametersError
 
     composed_name = ""
-    variables = []
+    variables = {}
     assumptions = {}
     guarantees = {}
     abstracted_guarantees = {}
@@ -39,7 +39,7 @@ def compose_contracts(contracts, abstract_on_guarantees=None):
 
     for name, contract in list(contracts_dictionary.items()):
         composed_name += name + "_"
-        variables.append(contract.get_variables())
+        variables.update(contract.get_variables())
         assumptions[name + "_assumptions"] = contract.get_assumptions()
         guarantees[name + "_guarantees"] = contract.get_guarantees()
         if contract.is_abstracted():